@@ -0,0 +1,61 @@
+# backend/benchmarks/bench_invoices.py
+"""
+Invoice listing cost per role, through the same service call GET /api/invoices makes.
+
+Run from backend/:  python -m benchmarks.bench_invoices [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="bench-invoices-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret")
+os.environ["NOTIFICATION_OUTBOX_WORKER"] = "false"
+
+from sqlalchemy import event, insert
+from main import create_app
+from models import db, Customer, Installation, Invoice
+from utils.invoices import ROLE_PROJECTIONS, invoice_listing, serialize_invoice_row
+from utils.projections import fetch_all
+
+
+def seed(rows):
+    db.session.execute(insert(Customer), [
+        {"name": f"Customer {i}", "email": f"c{i}@bench", "status": "active"} for i in range(1000)
+    ])
+    db.session.execute(insert(Installation), [
+        {"customer_id": i % 1000 + 1, "customer_name": f"Customer {i % 1000}",
+         "package_type": "Core", "status": "Completed"}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(Invoice), [
+        {"amount": 100.0 + i % 50, "status": ("pending", "paid", "overdue")[i % 3],
+         "installation_id": i + 1, "customer_id": i % 1000 + 1}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def main(rows=50000):
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(rows)
+
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(1))
+        for role in sorted(ROLE_PROJECTIONS):
+            for label, args in (("all", {}), ("paid", {"status": "paid"})):
+                statements.clear()
+                started = time.perf_counter()
+                query = invoice_listing(role, args).order_by(Invoice.id.desc())
+                payload = [serialize_invoice_row(row) for row in fetch_all(query)]
+                elapsed = time.perf_counter() - started
+                print(f"{role:<8} {label:<5} {elapsed * 1000:>8.1f} ms  {len(statements)} query  ({len(payload):,} rows)")
+    os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
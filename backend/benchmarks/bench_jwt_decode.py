@@ -0,0 +1,31 @@
+# backend/benchmarks/bench_jwt_decode.py
+"""
+Cached vs uncached verified-JWT decode throughput.
+
+Run from backend/:  python -m benchmarks.bench_jwt_decode [iterations]
+"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret")
+
+from config import Config
+from utils.jwt_utils import generate_tokens, decode_token, token_cache
+
+
+def main(iterations=20000):
+    token, _ = generate_tokens(1, "technician", "bench")
+    token_cache.clear()
+
+    uncached = timeit.timeit(lambda: decode_token(token, Config.JWT_SECRET, use_cache=False), number=iterations)
+    cached = timeit.timeit(lambda: decode_token(token, Config.JWT_SECRET), number=iterations)
+
+    print(f"iterations: {iterations}")
+    print(f"uncached:   {iterations / uncached:>12,.0f} decodes/s  ({uncached / iterations * 1e6:.2f} us/op)")
+    print(f"cached:     {iterations / cached:>12,.0f} decodes/s  ({cached / iterations * 1e6:.2f} us/op)")
+    print(f"speedup:    {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
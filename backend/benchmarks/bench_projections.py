@@ -0,0 +1,99 @@
+# backend/benchmarks/bench_projections.py
+"""
+ORM entities + lazy technician vs the installations list Projection.
+
+Seeds a throwaway SQLite database, then times building the /installations payload both ways.
+
+Run from backend/:  python -m benchmarks.bench_projections [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="bench-projections-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret")
+os.environ["NOTIFICATION_OUTBOX_WORKER"] = "false"
+
+from sqlalchemy import insert
+from main import create_app
+from models import db, User, Customer, Installation
+from routes.manager_routes import INSTALLATION_LIST
+
+
+def seed(rows):
+    technicians = 50
+    db.session.execute(insert(User), [
+        {"username": f"tech{i}", "email": f"tech{i}@bench", "password_hash": "x", "role": "technician"}
+        for i in range(technicians)
+    ])
+    db.session.execute(insert(Customer), [
+        {"name": f"Customer {i}", "email": f"c{i}@bench", "status": "active"} for i in range(1000)
+    ])
+    start = datetime(2026, 1, 1)
+    db.session.execute(insert(Installation), [
+        {
+            "customer_id": i % 1000 + 1,
+            "customer_name": f"Customer {i % 1000}",
+            "package_type": "Core",
+            "status": "Scheduled",
+            "technician_id": i % technicians + 1,
+            "scheduled_date": start + timedelta(hours=i),
+            "price": 100.0 + i % 50,
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def orm_payload():
+    return [
+        {
+            "id": i.id,
+            "customer_id": i.customer_id,
+            "customer_name": i.customer_name,
+            "package_type": i.package_type,
+            "status": i.status,
+            "technician_id": i.technician_id,
+            "technician_name": i.technician.username if i.technician else None,
+            "scheduled_date": i.scheduled_date.isoformat() if i.scheduled_date else None,
+            "end_date": i.end_date.isoformat() if i.end_date else None,
+            "price": i.price,
+        }
+        for i in Installation.query.order_by(Installation.id).all()
+    ]
+
+
+def projection_payload():
+    statement = INSTALLATION_LIST.statement.order_by(Installation.id)
+    return [INSTALLATION_LIST.serialize(row) for row in INSTALLATION_LIST.rows(statement)]
+
+
+def measure(label, build):
+    db.session.expunge_all()
+    tracemalloc.start()
+    started = time.perf_counter()
+    payload = build()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<11} {elapsed * 1000:>9.1f} ms   peak {peak / 2**20:>7.1f} MB   ({len(payload):,} rows)")
+    return elapsed
+
+
+def main(rows=100000):
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(rows)
+        orm = measure("orm:", orm_payload)
+        projected = measure("projection:", projection_payload)
+        print(f"speedup:    {orm / projected:.1f}x")
+    os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
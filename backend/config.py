@@ -1,5 +1,6 @@
 # backend/config.py
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()  # Load environment variables from .env file
@@ -18,12 +19,113 @@ class Config:
     # JWT configuration
     JWT_SECRET = os.getenv("JWT_SECRET")
     JWT_REFRESH_SECRET = os.getenv("JWT_REFRESH_SECRET")
+    # Verified-payload cache in utils/jwt_utils.py (entries expire at the token's exp)
+    JWT_DECODE_CACHE_SIZE = int(os.getenv("JWT_DECODE_CACHE_SIZE", 4096))
+    # Seconds between pulls of token_revocations: how long a logout / role change in one
+    # worker process can take to reach the others
+    JWT_REVOCATION_SYNC_SECONDS = float(os.getenv("JWT_REVOCATION_SYNC_SECONDS", 5))
 
+    # Principal cache used by token_required (see utils/principal_cache.py)
+    PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024))
+    PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", 60))  # seconds
+    # When true, the verified JWT claims (user_id, username, role) are trusted
+    # outright and the users table is never read on the auth path.
+    AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
 
+    # Password hashing (see utils/passwords.py)
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    # When > 0, calibrate the cost at startup to the highest one hashing within this many ms
+    BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", 0))
+    BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+    BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", 14))
+    # Where the calibrated cost is shared between workers (default: <instance>/bcrypt-rounds);
+    # delete it to recalibrate, e.g. after moving to different hardware
+    BCRYPT_CALIBRATION_FILE = os.getenv("BCRYPT_CALIBRATION_FILE", "")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 64))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv("PASSWORD_HASH_TIMEOUT", 10))  # seconds to wait for a slot
 
+    # Real-time notifications (see utils/notification_broker.py)
+    # "memory" = per-process fan-out, "spool" = shared file stand-in for multi-worker deployments
+    NOTIFICATION_BROKER = os.getenv("NOTIFICATION_BROKER", "memory")
+    NOTIFICATION_SPOOL_PATH = os.getenv(
+        "NOTIFICATION_SPOOL_PATH", os.path.join(tempfile.gettempdir(), "masterful-notifications.spool")
+    )
+    NOTIFICATION_STREAM_BUFFER = int(os.getenv("NOTIFICATION_STREAM_BUFFER", 100))   # events per client
+    NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", 15))  # seconds
+    NOTIFICATION_STREAM_MAX_SECONDS = int(os.getenv("NOTIFICATION_STREAM_MAX_SECONDS", 300))
+    # Open streams per worker process; each holds a request thread, so keep this below
+    # gunicorn's --threads (Procfile: 8) or streams starve ordinary requests. Over it: 503.
+    NOTIFICATION_STREAM_MAX_CONNECTIONS = int(os.getenv("NOTIFICATION_STREAM_MAX_CONNECTIONS", 4))
 
+    # Notification outbox (see utils/notification_outbox.py). The in-process worker starts
+    # with the first request; set it to false when running `flask notifications drain-outbox --loop`.
+    NOTIFICATION_OUTBOX_WORKER = os.getenv("NOTIFICATION_OUTBOX_WORKER", "true").lower() == "true"
+    NOTIFICATION_OUTBOX_INTERVAL = float(os.getenv("NOTIFICATION_OUTBOX_INTERVAL", 5))  # seconds
+    NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.getenv("NOTIFICATION_OUTBOX_BATCH_SIZE", 100))
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 5))  # then closed as failed
+    # Role -> user ids map for fan-out (utils/recipient_directory.py); TTL covers other workers' edits
+    RECIPIENT_DIRECTORY_TTL = int(os.getenv("RECIPIENT_DIRECTORY_TTL", 300))
 
+    # Notification retention (flask notifications purge)
+    NOTIFICATION_RETENTION_READ_DAYS = int(os.getenv("NOTIFICATION_RETENTION_READ_DAYS", 30))
+    NOTIFICATION_RETENTION_UNREAD_DAYS = int(os.getenv("NOTIFICATION_RETENTION_UNREAD_DAYS", 180))
+    NOTIFICATION_PURGE_BATCH_SIZE = int(os.getenv("NOTIFICATION_PURGE_BATCH_SIZE", 1000))
+    # Copy purged rows into notifications_archive instead of dropping them
+    NOTIFICATION_ARCHIVE = os.getenv("NOTIFICATION_ARCHIVE", "false").lower() == "true"
 
 
 
 
+
+
+
+
+
+
+    # Finance / invoice summaries (see utils/summaries.py)
+    # "rollups" = finance_rollups table, "live" = single-pass aggregates over invoices/installations
+    FINANCE_SUMMARY_SOURCE = os.getenv("FINANCE_SUMMARY_SOURCE", "rollups")
+    SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", 30))  # seconds; 0 disables
+
+    # HTTP response cache + ETags for dashboard endpoints (see utils/response_cache.py)
+    # "memory" = per-process LRU, "filesystem" = shared directory for multi-worker deployments, "none" = off
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))   # entries
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 60))      # seconds; bounds cross-worker staleness
+    RESPONSE_CACHE_DIR = os.getenv(
+        "RESPONSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "masterful-response-cache")
+    )
+
+    # Global search (see utils/search.py): "auto" = pg_trgm on PostgreSQL, FTS5 on SQLite
+    # (after `flask db upgrade` or `flask search rebuild`), ILIKE otherwise; "like" forces ILIKE;
+    # "memory" = per-process n-gram index (utils/search_index.py), "auto" until it is loaded
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+    # JSON snapshot for warm starts; default <instance>/search-index.json. Refused unless owned
+    # by this process's user and not group/other-writable.
+    SEARCH_INDEX_SNAPSHOT = os.getenv("SEARCH_INDEX_SNAPSHOT", "")
+    SEARCH_INDEX_REFRESH = int(os.getenv("SEARCH_INDEX_REFRESH", 600))  # seconds between background rebuilds
+    SEARCH_MIN_QUERY = int(os.getenv("SEARCH_MIN_QUERY", 2))           # characters
+    SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", 20))  # hits per entity
+    SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", 100))
+    SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", 5))               # per-entity queries run in parallel
+
+    # Typeahead (/api/search/suggest, see utils/suggest.py): in-memory prefix index over
+    # customer names/emails, usernames/emails and package types, plus an LRU of recent prefixes
+    SUGGEST_DEFAULT_LIMIT = int(os.getenv("SUGGEST_DEFAULT_LIMIT", 8))  # suggestions per keystroke
+    SUGGEST_MAX_LIMIT = int(os.getenv("SUGGEST_MAX_LIMIT", 20))
+    SUGGEST_CACHE_SIZE = int(os.getenv("SUGGEST_CACHE_SIZE", 512))      # cached prefixes
+    SUGGEST_INDEX_TTL = int(os.getenv("SUGGEST_INDEX_TTL", 60))         # seconds; bounds cross-worker staleness
+
+    # Technician scheduling (see utils/schedule.py): overlapping bookings are rejected
+    SCHEDULE_DEFAULT_DURATION_HOURS = float(os.getenv("SCHEDULE_DEFAULT_DURATION_HOURS", 4))  # booking with no end_date
+    SCHEDULE_MAX_WINDOW_DAYS = int(os.getenv("SCHEDULE_MAX_WINDOW_DAYS", 92))  # /technicians/<id>/availability
+    # Longest allowed booking; bounds how far back the overlap check has to look
+    SCHEDULE_MAX_BOOKING_DAYS = int(os.getenv("SCHEDULE_MAX_BOOKING_DAYS", 14))
+
+    # Technician auto-assignment (see utils/assignment.py). The in-process worker starts
+    # with the first request; set it to false when running `flask assignments process --loop`.
+    ASSIGNMENT_WORKER = os.getenv("ASSIGNMENT_WORKER", "true").lower() == "true"
+    ASSIGNMENT_INTERVAL = float(os.getenv("ASSIGNMENT_INTERVAL", 10))        # seconds between polls
+    ASSIGNMENT_STALE_AFTER = int(os.getenv("ASSIGNMENT_STALE_AFTER", 600))   # seconds before a stuck run is retried
+    ASSIGNMENT_MAX_WINDOW_DAYS = int(os.getenv("ASSIGNMENT_MAX_WINDOW_DAYS", 31))
@@ -15,13 +15,16 @@ def create_app():
     bcrypt.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+
+    from utils.passwords import password_hasher
+    password_hasher.init_app(app)
    
     
     
     CORS(app, resources={r"/api/*": {"origins": [
     "http://localhost:5173",
     "https://masterful-homes.vercel.app"
-    ]}}, supports_credentials=True)
+    ]}}, supports_credentials=True, expose_headers=["ETag", "X-Search-Has-More"])
 
 
     # Import and register blueprints
@@ -33,6 +36,7 @@ def create_app():
     from routes.search_routes import search_bp
     from routes.notification_routes import notification_bp
     from routes.invoice_routes import invoice_bp
+    from routes.assignment_routes import assignment_bp
     
     app.register_blueprint(invoice_bp, url_prefix="/api")
     app.register_blueprint(notification_bp, url_prefix="/api")
@@ -42,6 +46,31 @@ def create_app():
     app.register_blueprint(manager_bp, url_prefix="/api")
     app.register_blueprint(auth_bp, url_prefix="/api")
     app.register_blueprint(admin_bp, url_prefix="/api")
+    app.register_blueprint(assignment_bp, url_prefix="/api")
+
+    # Compile per-endpoint role policies now that every view is registered
+    from utils.auth_middleware import compile_role_policies
+    compile_role_policies(app)
+
+    # CLI jobs: flask notifications ...
+    from utils.notifications import notifications_cli
+    import utils.notification_retention  # registers `flask notifications purge`
+    app.cli.add_command(notifications_cli)
+    from utils.finance_metrics import finance_cli
+    app.cli.add_command(finance_cli)
+    from utils.search import search_cli
+    from utils.search_index import search_index  # also registers `flask search snapshot`
+    app.cli.add_command(search_cli)
+    from utils.assignment import assignment_cli, assignment_worker
+    app.cli.add_command(assignment_cli)
+
+    # Deliver notification intents written by the routes
+    from utils.notification_outbox import outbox_worker
+    outbox_worker.init_app(app)
+    # In-memory search index (SEARCH_BACKEND=memory): warm start + background refresh
+    search_index.init_app(app)
+    # Technician auto-assignment proposals (POST /api/assignments/proposals)
+    assignment_worker.init_app(app)
 
     @app.route("/")
     def index():
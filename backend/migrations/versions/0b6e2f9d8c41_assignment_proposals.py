@@ -0,0 +1,41 @@
+"""assignment proposals
+
+Revision ID: 0b6e2f9d8c41
+Revises: f3c07a9e5d14
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6e2f9d8c41'
+down_revision = 'f3c07a9e5d14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('assignment_proposals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('window_start', sa.DateTime(), nullable=False),
+    sa.Column('window_end', sa.DateTime(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('assignments', sa.Text(), nullable=True),
+    sa.Column('unassigned', sa.Text(), nullable=True),
+    sa.Column('error', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('applied_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assignment_proposals_status'), 'assignment_proposals', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_assignment_proposals_status'), table_name='assignment_proposals')
+    op.drop_table('assignment_proposals')
@@ -0,0 +1,35 @@
+"""token revocations shared between worker processes
+
+Revision ID: 3c8f1a6d2e57
+Revises: 9e4b7c2a1d63
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8f1a6d2e57'
+down_revision = '9e4b7c2a1d63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('token_revocations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('token_key', sa.String(length=64), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('revoked_at', sa.Float(), nullable=False),
+    sa.Column('expires_at', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_token_revocations_revoked_at'), 'token_revocations', ['revoked_at'], unique=False)
+    op.create_index(op.f('ix_token_revocations_expires_at'), 'token_revocations', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_token_revocations_expires_at'), table_name='token_revocations')
+    op.drop_index(op.f('ix_token_revocations_revoked_at'), table_name='token_revocations')
+    op.drop_table('token_revocations')
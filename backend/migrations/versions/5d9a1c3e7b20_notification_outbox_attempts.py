@@ -0,0 +1,28 @@
+"""notification outbox delivery attempts
+
+Revision ID: 5d9a1c3e7b20
+Revises: 0b6e2f9d8c41
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d9a1c3e7b20'
+down_revision = '0b6e2f9d8c41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_error', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('attempts')
@@ -0,0 +1,29 @@
+"""composite index backing keyset pagination of notifications
+
+Revision ID: 7a428d785708
+Revises: ecc466d657e5
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a428d785708'
+down_revision = 'ecc466d657e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_notifications_user_created_id',
+        'notifications',
+        ['user_id', sa.text('created_at DESC'), 'id'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_notifications_user_created_id', table_name='notifications')
@@ -0,0 +1,37 @@
+"""notification outbox
+
+Revision ID: 87bd7a11e5bb
+Revises: a5167092a66f
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '87bd7a11e5bb'
+down_revision = 'a5167092a66f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.String(length=255), nullable=False),
+    sa.Column('object_type', sa.String(length=50), nullable=True),
+    sa.Column('object_id', sa.Integer(), nullable=True),
+    sa.Column('extra', sa.String(length=1024), nullable=True),
+    sa.Column('roles', sa.String(length=255), nullable=True),
+    sa.Column('user_ids', sa.String(length=1024), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notification_outbox_processed_at'), 'notification_outbox', ['processed_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_notification_outbox_processed_at'), table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -0,0 +1,40 @@
+"""notification retention: purge index and archive table
+
+Revision ID: 92eab816682f
+Revises: 87bd7a11e5bb
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '92eab816682f'
+down_revision = '87bd7a11e5bb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_notifications_created_at', 'notifications', ['created_at'], unique=False)
+
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.String(length=255), nullable=False),
+    sa.Column('object_type', sa.String(length=50), nullable=True),
+    sa.Column('object_id', sa.Integer(), nullable=True),
+    sa.Column('extra', sa.String(length=1024), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_archive_user_id'), 'notifications_archive', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_notifications_archive_user_id'), table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.drop_index('ix_notifications_created_at', table_name='notifications')
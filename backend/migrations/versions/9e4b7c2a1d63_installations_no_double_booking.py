@@ -0,0 +1,70 @@
+"""no double-booking: tsrange exclusion constraint on installations (PostgreSQL)
+
+Revision ID: 9e4b7c2a1d63
+Revises: 5d9a1c3e7b20
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b7c2a1d63'
+down_revision = '5d9a1c3e7b20'
+branch_labels = None
+depends_on = None
+
+# Snapshot of SCHEDULE_DEFAULT_DURATION_HOURS (utils/schedule.py) at this revision:
+# a booking without end_date blocks this long. Changing the setting needs a new revision.
+DEFAULT_DURATION = "interval '4 hours'"
+
+
+def _booking_range(alias=None):
+    prefix = f"{alias}." if alias else ""
+    return (f"tsrange({prefix}scheduled_date, "
+            f"COALESCE({prefix}end_date, {prefix}scheduled_date + {DEFAULT_DURATION}), '[)')")
+
+
+OVERLAPS = f"""
+SELECT a.id, b.id FROM installations a JOIN installations b
+  ON a.technician_id = b.technician_id AND a.id < b.id AND {_booking_range('a')} && {_booking_range('b')}
+ WHERE a.scheduled_date IS NOT NULL AND b.scheduled_date IS NOT NULL
+   AND (a.end_date IS NULL OR a.end_date > a.scheduled_date)
+   AND (b.end_date IS NULL OR b.end_date > b.scheduled_date)
+ LIMIT 20
+"""
+
+INVERTED = """
+SELECT id FROM installations
+ WHERE technician_id IS NOT NULL AND end_date <= scheduled_date
+ LIMIT 20
+"""
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return   # elsewhere ensure_available's row lock is the only guard
+
+    # Refuse with the offending rows rather than a bare constraint error
+    inverted = [row[0] for row in bind.execute(sa.text(INVERTED))]
+    overlaps = [tuple(row) for row in bind.execute(sa.text(OVERLAPS))]
+    if inverted or overlaps:
+        raise RuntimeError(
+            "Fix these installations before upgrading: "
+            f"end_date not after scheduled_date {inverted}, double-booked pairs {overlaps}"
+        )
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        'ALTER TABLE installations ADD CONSTRAINT ex_installations_technician_booking '
+        f'EXCLUDE USING gist (technician_id WITH =, {_booking_range()} WITH &&) '
+        'WHERE (technician_id IS NOT NULL AND scheduled_date IS NOT NULL)'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('ALTER TABLE installations DROP CONSTRAINT IF EXISTS ex_installations_technician_booking')
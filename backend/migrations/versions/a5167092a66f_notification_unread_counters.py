@@ -0,0 +1,39 @@
+"""per-user unread notification counters
+
+Revision ID: a5167092a66f
+Revises: 7a428d785708
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5167092a66f'
+down_revision = '7a428d785708'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('unread', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from existing rows
+    notifications = sa.table('notifications', sa.column('user_id'), sa.column('is_read'))
+    counters = sa.table('notification_counters', sa.column('user_id'), sa.column('unread'))
+    op.execute(counters.insert().from_select(
+        ['user_id', 'unread'],
+        sa.select(notifications.c.user_id, sa.func.count())
+        .where(notifications.c.is_read == sa.false())
+        .group_by(notifications.c.user_id),
+    ))
+
+
+def downgrade():
+    op.drop_table('notification_counters')
@@ -0,0 +1,68 @@
+"""pre-aggregated finance rollups
+
+Revision ID: c41e7d2b9a30
+Revises: 92eab816682f
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from collections import defaultdict
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7d2b9a30'
+down_revision = '92eab816682f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    rollups = op.create_table('finance_rollups',
+    sa.Column('dimension', sa.String(length=30), nullable=False),
+    sa.Column('key', sa.String(length=120), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'key')
+    )
+
+    # Backfill (same rules as utils/finance_metrics.rebuild_rollups; `flask finance rebuild-metrics` redoes it)
+    invoices = sa.table('invoices', sa.column('status', sa.String), sa.column('amount', sa.Float),
+                        sa.column('created_at', sa.DateTime), sa.column('installation_id', sa.Integer))
+    installations = sa.table('installations', sa.column('id', sa.Integer), sa.column('status', sa.String),
+                             sa.column('package_type', sa.String), sa.column('technician_id', sa.Integer))
+    bind = op.get_bind()
+    totals = defaultdict(lambda: [0, 0.0])
+
+    rows = bind.execute(
+        sa.select(invoices.c.status, invoices.c.amount, invoices.c.created_at,
+                  installations.c.package_type, installations.c.technician_id)
+        .select_from(invoices.outerjoin(installations, invoices.c.installation_id == installations.c.id))
+    )
+    for status, amount, created_at, package_type, technician_id in rows:
+        amount = amount or 0
+        keys = [('invoice_status', status or 'pending')]
+        if status == 'paid':
+            if created_at:
+                keys.append(('month', created_at.strftime('%Y-%m')))
+            if package_type:
+                keys.append(('package', package_type))
+            if technician_id:
+                keys.append(('technician', str(technician_id)))
+        for key in keys:
+            totals[key][0] += 1
+            totals[key][1] += amount
+
+    for status, count in bind.execute(
+            sa.select(installations.c.status, sa.func.count()).group_by(installations.c.status)):
+        totals[('installation_status', status)][0] += count
+
+    if totals:
+        op.bulk_insert(rollups, [
+            {'dimension': dimension, 'key': key, 'count': count, 'amount': amount}
+            for (dimension, key), (count, amount) in totals.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('finance_rollups')
@@ -0,0 +1,23 @@
+"""invoices created_at index for time-bucketed revenue
+
+Revision ID: d8a3f61c0b27
+Revises: c41e7d2b9a30
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a3f61c0b27'
+down_revision = 'c41e7d2b9a30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_invoices_created_at', 'invoices', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_invoices_created_at', table_name='invoices')
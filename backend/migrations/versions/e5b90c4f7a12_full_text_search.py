@@ -0,0 +1,111 @@
+"""full-text search: pg_trgm indexes on PostgreSQL, FTS5 table + triggers on SQLite
+
+Revision ID: e5b90c4f7a12
+Revises: d8a3f61c0b27
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b90c4f7a12'
+down_revision = 'd8a3f61c0b27'
+branch_labels = None
+depends_on = None
+
+# Snapshot of utils/search.py's DDL at this revision (`flask search rebuild` regenerates it)
+POSTGRES_UPGRADE = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ix_customers_name_trgm ON customers USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_customers_email_trgm ON customers USING gin (email gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_customers_phone_trgm ON customers USING gin (phone gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_users_username_trgm ON users USING gin (username gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_users_role_trgm ON users USING gin (role gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_installations_customer_name_trgm ON installations USING gin (customer_name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_installations_package_type_trgm ON installations USING gin (package_type gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_installations_status_trgm ON installations USING gin (status gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_invoices_status_trgm ON invoices USING gin (status gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_tickets_issue_trgm ON tickets USING gin (issue gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_tickets_status_trgm ON tickets USING gin (status gin_trgm_ops)',
+]
+
+POSTGRES_DOWNGRADE = [
+    'DROP INDEX IF EXISTS ix_customers_name_trgm',
+    'DROP INDEX IF EXISTS ix_customers_email_trgm',
+    'DROP INDEX IF EXISTS ix_customers_phone_trgm',
+    'DROP INDEX IF EXISTS ix_users_username_trgm',
+    'DROP INDEX IF EXISTS ix_users_email_trgm',
+    'DROP INDEX IF EXISTS ix_users_role_trgm',
+    'DROP INDEX IF EXISTS ix_installations_customer_name_trgm',
+    'DROP INDEX IF EXISTS ix_installations_package_type_trgm',
+    'DROP INDEX IF EXISTS ix_installations_status_trgm',
+    'DROP INDEX IF EXISTS ix_invoices_status_trgm',
+    'DROP INDEX IF EXISTS ix_tickets_issue_trgm',
+    'DROP INDEX IF EXISTS ix_tickets_status_trgm',
+]
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE search_fts USING fts5(f1, f2, f3, tokenize='trigram')",
+    'CREATE TRIGGER search_fts_customers_ai AFTER INSERT ON customers BEGIN INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 1, new.name, new.email, new.phone); END',
+    'CREATE TRIGGER search_fts_customers_au AFTER UPDATE OF name, email, phone ON customers BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 1; INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 1, new.name, new.email, new.phone); END',
+    'CREATE TRIGGER search_fts_customers_ad AFTER DELETE ON customers BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 1; END',
+    'CREATE TRIGGER search_fts_users_ai AFTER INSERT ON users BEGIN INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 2, new.username, new.email, new.role); END',
+    'CREATE TRIGGER search_fts_users_au AFTER UPDATE OF username, email, role ON users BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 2; INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 2, new.username, new.email, new.role); END',
+    'CREATE TRIGGER search_fts_users_ad AFTER DELETE ON users BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 2; END',
+    'CREATE TRIGGER search_fts_installations_ai AFTER INSERT ON installations BEGIN INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 3, new.customer_name, new.package_type, new.status); END',
+    'CREATE TRIGGER search_fts_installations_au AFTER UPDATE OF customer_name, package_type, status ON installations BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 3; INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 3, new.customer_name, new.package_type, new.status); END',
+    'CREATE TRIGGER search_fts_installations_ad AFTER DELETE ON installations BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 3; END',
+    'CREATE TRIGGER search_fts_invoices_ai AFTER INSERT ON invoices BEGIN INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 4, new.status, NULL, NULL); END',
+    'CREATE TRIGGER search_fts_invoices_au AFTER UPDATE OF status ON invoices BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 4; INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 4, new.status, NULL, NULL); END',
+    'CREATE TRIGGER search_fts_invoices_ad AFTER DELETE ON invoices BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 4; END',
+    'CREATE TRIGGER search_fts_tickets_ai AFTER INSERT ON tickets BEGIN INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 5, new.issue, new.status, NULL); END',
+    'CREATE TRIGGER search_fts_tickets_au AFTER UPDATE OF issue, status ON tickets BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 5; INSERT INTO search_fts(rowid, f1, f2, f3) VALUES (new.id * 8 + 5, new.issue, new.status, NULL); END',
+    'CREATE TRIGGER search_fts_tickets_ad AFTER DELETE ON tickets BEGIN DELETE FROM search_fts WHERE rowid = old.id * 8 + 5; END',
+    'INSERT INTO search_fts(rowid, f1, f2, f3) SELECT customers.id * 8 + 1, customers.name, customers.email, customers.phone FROM customers',
+    'INSERT INTO search_fts(rowid, f1, f2, f3) SELECT users.id * 8 + 2, users.username, users.email, users.role FROM users',
+    'INSERT INTO search_fts(rowid, f1, f2, f3) SELECT installations.id * 8 + 3, installations.customer_name, installations.package_type, installations.status FROM installations',
+    'INSERT INTO search_fts(rowid, f1, f2, f3) SELECT invoices.id * 8 + 4, invoices.status, NULL, NULL FROM invoices',
+    'INSERT INTO search_fts(rowid, f1, f2, f3) SELECT tickets.id * 8 + 5, tickets.issue, tickets.status, NULL FROM tickets',
+]
+
+SQLITE_DOWNGRADE = [
+    'DROP TRIGGER IF EXISTS search_fts_customers_ai',
+    'DROP TRIGGER IF EXISTS search_fts_customers_au',
+    'DROP TRIGGER IF EXISTS search_fts_customers_ad',
+    'DROP TRIGGER IF EXISTS search_fts_users_ai',
+    'DROP TRIGGER IF EXISTS search_fts_users_au',
+    'DROP TRIGGER IF EXISTS search_fts_users_ad',
+    'DROP TRIGGER IF EXISTS search_fts_installations_ai',
+    'DROP TRIGGER IF EXISTS search_fts_installations_au',
+    'DROP TRIGGER IF EXISTS search_fts_installations_ad',
+    'DROP TRIGGER IF EXISTS search_fts_invoices_ai',
+    'DROP TRIGGER IF EXISTS search_fts_invoices_au',
+    'DROP TRIGGER IF EXISTS search_fts_invoices_ad',
+    'DROP TRIGGER IF EXISTS search_fts_tickets_ai',
+    'DROP TRIGGER IF EXISTS search_fts_tickets_au',
+    'DROP TRIGGER IF EXISTS search_fts_tickets_ad',
+    'DROP TABLE IF EXISTS search_fts',
+]
+
+
+def _run(statements):
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _run(POSTGRES_UPGRADE)
+    elif dialect == 'sqlite':
+        _run(SQLITE_UPGRADE)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _run(POSTGRES_DOWNGRADE)
+    elif dialect == 'sqlite':
+        _run(SQLITE_DOWNGRADE)
@@ -0,0 +1,27 @@
+"""installations board indexes: (technician_id, scheduled_date, id) and (status, scheduled_date, id)
+
+Revision ID: f3c07a9e5d14
+Revises: e5b90c4f7a12
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c07a9e5d14'
+down_revision = 'e5b90c4f7a12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_installations_technician_scheduled', 'installations',
+                    ['technician_id', 'scheduled_date', 'id'], unique=False)
+    op.create_index('ix_installations_status_scheduled', 'installations',
+                    ['status', 'scheduled_date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_installations_status_scheduled', table_name='installations')
+    op.drop_index('ix_installations_technician_scheduled', table_name='installations')
@@ -81,6 +81,14 @@ class Installation(db.Model):
     # Relationship to invoice (1:1)
     invoice = relationship("Invoice", back_populates="installation", uselist=False)
 
+    __table_args__ = (
+        # Serve the installations board: WHERE technician_id=? / status=? ORDER BY scheduled_date, id
+        db.Index("ix_installations_technician_scheduled", technician_id, scheduled_date, id),
+        db.Index("ix_installations_status_scheduled", status, scheduled_date, id),
+        # PostgreSQL also has ex_installations_technician_booking (migration 9e4b7c2a1d63):
+        # no two bookings of one technician may overlap
+    )
+
 
 class Ticket(db.Model):
     __tablename__ = "tickets"
@@ -113,6 +121,11 @@ class Invoice(db.Model):
 
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
+    __table_args__ = (
+        # Range scans for time-bucketed revenue (utils/time_buckets.py)
+        db.Index("ix_invoices_created_at", created_at),
+    )
+
     def __repr__(self):
         return f"<Invoice {self.id}, status={self.status}, amount={self.amount}>"
 
@@ -133,3 +146,113 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Serves keyset pagination: WHERE user_id=? ORDER BY created_at DESC, id
+        db.Index("ix_notifications_user_created_id", user_id, created_at.desc(), id),
+        # Serves the retention purge scan (utils/notification_retention.py)
+        db.Index("ix_notifications_created_at", created_at),
+    )
+
+
+class NotificationArchive(db.Model):
+    """Cold storage for purged notifications when NOTIFICATION_ARCHIVE is on."""
+    __tablename__ = "notifications_archive"
+
+    id = db.Column(db.Integer, primary_key=True)   # same id as the original row
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    message = db.Column(db.String(255), nullable=False)
+    object_type = db.Column(db.String(50), nullable=True)
+    object_id = db.Column(db.Integer, nullable=True)
+    extra = db.Column(db.String(1024), nullable=True)
+    is_read = db.Column(db.Boolean, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+
+class NotificationCounter(db.Model):
+    """Denormalized per-user unread count, kept in step by utils/notifications.py."""
+    __tablename__ = "notification_counters"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = db.Column(db.Integer, default=0, nullable=False)
+
+
+class NotificationOutbox(db.Model):
+    """
+    Notification intents written in the same transaction as the business change;
+    utils/notification_outbox.py resolves recipients and fans them out later.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    message = db.Column(db.String(255), nullable=False)
+    object_type = db.Column(db.String(50), nullable=True)
+    object_id = db.Column(db.Integer, nullable=True)
+    extra = db.Column(db.String(1024), nullable=True)       # JSON string (optional)
+
+    roles = db.Column(db.String(255), nullable=True)        # comma-separated role names
+    user_ids = db.Column(db.String(1024), nullable=True)    # comma-separated explicit recipients
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    # Delivery failures; after NOTIFICATION_OUTBOX_MAX_ATTEMPTS the entry is closed
+    # (processed_at set) with last_error kept, so it no longer blocks the queue
+    attempts = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_error = db.Column(db.String(255), nullable=True)
+
+
+class FinanceRollup(db.Model):
+    """
+    Pre-aggregated finance metrics, kept in step with invoices/installations by
+    utils/finance_metrics.py. One row per (dimension, key), e.g.
+    ("month", "2026-03"), ("package", "Core"), ("technician", "7"),
+    ("invoice_status", "paid"), ("installation_status", "Completed").
+    """
+    __tablename__ = "finance_rollups"
+
+    dimension = db.Column(db.String(30), primary_key=True)
+    key = db.Column(db.String(120), primary_key=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+    amount = db.Column(db.Float, default=0, nullable=False)
+
+
+class AssignmentProposal(db.Model):
+    """
+    A batch technician assignment for the unassigned installations scheduled in
+    [window_start, window_end), computed in the background by utils/assignment.py
+    and applied (or not) by a manager after preview.
+    status: pending -> running -> ready | failed; ready -> applied | stale
+    """
+    __tablename__ = "assignment_proposals"
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), default="pending", nullable=False, index=True)
+    window_start = db.Column(db.DateTime, nullable=False)
+    window_end = db.Column(db.DateTime, nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    assignments = db.Column(db.Text, nullable=True)   # JSON: [{installation_id, technician_id, ...}]
+    unassigned = db.Column(db.Text, nullable=True)    # JSON: [installation_id, ...] with no free technician
+    error = db.Column(db.String(255), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    applied_at = db.Column(db.DateTime, nullable=True)
+
+
+class TokenRevocation(db.Model):
+    """
+    Revoked JWTs, shared by every worker process (utils/jwt_utils.py syncs them
+    into its in-process cache). Either one token (token_key = SHA-256 hex) or
+    every token a user was issued up to revoked_at (user_id). Rows are pruned
+    once the tokens they cover have expired.
+    """
+    __tablename__ = "token_revocations"
+
+    id = db.Column(db.Integer, primary_key=True)
+    token_key = db.Column(db.String(64), nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)            # no FK: outlives a deleted user
+    revoked_at = db.Column(db.Float, nullable=False, index=True)   # epoch seconds, compared with `iat`
+    expires_at = db.Column(db.Float, nullable=False, index=True)
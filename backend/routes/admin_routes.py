@@ -1,37 +1,38 @@
 # backend/routes/admin_routes.py
 from flask import Blueprint, request, jsonify
 from models import db, User
-from utils.auth_middleware import token_required
-from flask_bcrypt import Bcrypt
+from utils.auth_middleware import token_required, roles_allowed
+from utils.principal_cache import principal_cache, invalidate_principal
+from utils.jwt_utils import revoke_user_tokens
+from utils.recipient_directory import recipient_directory
+from utils.streaming import collection_response
+from utils.response_cache import response_cache
+from utils.projections import Projection
+from utils.passwords import password_hasher, PasswordHasherBusy
 
 admin_bp = Blueprint("admin", __name__)
-bcrypt = Bcrypt()
 
-# 👥 GET all users
+USER_LIST = Projection(User, [
+    ("id", User.id),
+    ("username", User.username),
+    ("email", User.email),
+    ("role", User.role),
+])
+
+
+# 👥 GET all users (?format=json-stream|ndjson to stream)
 @admin_bp.route("/admin/users", methods=["GET"])
 @token_required
+@roles_allowed("admin")
 def get_users(current_user):
-    if current_user.role != "admin":
-        return jsonify({"message": "Access forbidden"}), 403
-
-    users = User.query.all()
-    users_data = [{
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "role": user.role
-    } for user in users]
-
-    return jsonify(users_data), 200
+    return collection_response(USER_LIST.statement.order_by(User.id), USER_LIST.serialize)
 
 
 # ➕ CREATE user
 @admin_bp.route("/admin/users", methods=["POST"])
 @token_required
+@roles_allowed("admin")
 def create_user(current_user):
-    if current_user.role != "admin":
-        return jsonify({"message": "Access forbidden"}), 403
-
     data = request.get_json()
     username = data.get("username")
     email = data.get("email")
@@ -44,12 +45,17 @@ def create_user(current_user):
     if User.query.filter_by(email=email).first():
         return jsonify({"message": "User already exists with this email"}), 409
 
-    hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
+    try:
+        hashed_password = password_hasher.hash_password(password)
+    except PasswordHasherBusy:
+        return jsonify({"message": "Server busy, please retry"}), 503
+
     new_user = User(username=username, email=email,
                     password_hash=hashed_password, role=role)
 
     db.session.add(new_user)
     db.session.commit()
+    recipient_directory.invalidate()
 
     return jsonify({"message": "User created successfully", "id": new_user.id}), 201
 
@@ -57,37 +63,61 @@ def create_user(current_user):
 # ✏️ UPDATE user
 @admin_bp.route("/admin/users/<int:user_id>", methods=["PUT"])
 @token_required
+@roles_allowed("admin")
 def update_user(current_user, user_id):
-    if current_user.role != "admin":
-        return jsonify({"message": "Access forbidden"}), 403
-
     user = User.query.get(user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
 
     data = request.get_json()
+    old_role = user.role
     user.username = data.get("username", user.username)
     user.email = data.get("email", user.email)
     user.role = data.get("role", user.role)
 
     if data.get("password"):
-        user.password_hash = bcrypt.generate_password_hash(data["password"]).decode("utf-8")
+        try:
+            user.password_hash = password_hasher.hash_password(data["password"])
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return jsonify({"message": "Server busy, please retry"}), 503
 
     db.session.commit()
+    invalidate_principal(user_id)
+    recipient_directory.invalidate()
+    if user.role != old_role:
+        revoke_user_tokens(user_id)  # tokens carry the old role claim
     return jsonify({"message": "User updated successfully"}), 200
 
 
 # ❌ DELETE user
 @admin_bp.route("/admin/users/<int:user_id>", methods=["DELETE"])
 @token_required
+@roles_allowed("admin")
 def delete_user(current_user, user_id):
-    if current_user.role != "admin":
-        return jsonify({"message": "Access forbidden"}), 403
-
     user = User.query.get(user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
 
     db.session.delete(user)
     db.session.commit()
+    invalidate_principal(user_id)
+    recipient_directory.invalidate()
+    revoke_user_tokens(user_id)
     return jsonify({"message": "User deleted successfully"}), 200
+
+
+# 📊 Auth principal cache counters
+@admin_bp.route("/admin/auth/cache-stats", methods=["GET"])
+@token_required
+@roles_allowed("admin")
+def auth_cache_stats(current_user):
+    return jsonify(principal_cache.stats()), 200
+
+
+# 📊 Response cache hit/miss/304 counters (this worker)
+@admin_bp.route("/admin/response-cache/stats", methods=["GET"])
+@token_required
+@roles_allowed("admin")
+def response_cache_stats(current_user):
+    return jsonify(response_cache.stats()), 200
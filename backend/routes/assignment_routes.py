@@ -0,0 +1,54 @@
+# backend/routes/assignment_routes.py
+from datetime import timedelta
+from flask import Blueprint, request, jsonify
+from models import db, AssignmentProposal
+from utils.auth_middleware import token_required, roles_allowed
+from utils.assignment import AssignmentError, request_proposal, serialize_proposal, apply_proposal
+from utils.datetimes import naive_utc, parse_iso_datetime
+from config import Config
+
+assignment_bp = Blueprint("assignments", __name__)
+
+
+# 🤖 Request an auto-assignment proposal for unassigned installations in {"from", "to"} (ISO).
+# Computed by the background worker; poll GET /assignments/proposals/<id> until status is ready.
+@assignment_bp.route("/assignments/proposals", methods=["POST"])
+@token_required
+@roles_allowed("admin", "manager")
+def create_proposal(current_user):
+    data = request.get_json() or {}
+    start = naive_utc(parse_iso_datetime(data.get("from")))
+    end = naive_utc(parse_iso_datetime(data.get("to")))
+    if start is None or end is None:
+        return jsonify({"message": "from and to must be ISO 8601 datetimes"}), 400
+    if end <= start:
+        return jsonify({"message": "to must be after from"}), 400
+    if end - start > timedelta(days=Config.ASSIGNMENT_MAX_WINDOW_DAYS):
+        return jsonify({"message": f"Window cannot exceed {Config.ASSIGNMENT_MAX_WINDOW_DAYS} days"}), 400
+
+    proposal = request_proposal(start, end, created_by=current_user.id)
+    db.session.commit()
+    return jsonify({"id": proposal.id, "status": proposal.status}), 202
+
+
+# 🔎 Preview a proposal: proposed technician per installation, plus jobs no one is free for
+@assignment_bp.route("/assignments/proposals/<int:proposal_id>", methods=["GET"])
+@token_required
+@roles_allowed("admin", "manager")
+def get_proposal(current_user, proposal_id):
+    proposal = db.session.get(AssignmentProposal, proposal_id)
+    if not proposal:
+        return jsonify({"message": "Proposal not found"}), 404
+    return jsonify(serialize_proposal(proposal)), 200
+
+
+# ✅ Apply a ready proposal in one transaction (409 with conflicts if the schedule moved since)
+@assignment_bp.route("/assignments/proposals/<int:proposal_id>/apply", methods=["POST"])
+@token_required
+@roles_allowed("admin", "manager")
+def apply_proposal_route(current_user, proposal_id):
+    try:
+        applied = apply_proposal(proposal_id)
+    except AssignmentError as e:
+        return jsonify({"message": e.message, "conflicts": e.conflicts}), e.status
+    return jsonify({"message": "Proposal applied", "assigned": applied}), 200
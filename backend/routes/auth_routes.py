@@ -1,11 +1,11 @@
 # backend/routes/auth_routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from models import db, User
-from flask_bcrypt import Bcrypt
-from utils.jwt_utils import generate_tokens, decode_token
+from utils.passwords import password_hasher, PasswordHasherBusy
+from utils.recipient_directory import recipient_directory
+from utils.jwt_utils import generate_tokens, decode_token, revoke_token
 from config import Config
 
-bcrypt = Bcrypt()
 auth_bp = Blueprint("auth", __name__)
 
 
@@ -24,7 +24,10 @@ def register():
     if User.query.filter_by(email=email).first():
         return jsonify({"message": "User already exists with this email."}), 409
 
-    hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
+    try:
+        hashed_password = password_hasher.hash_password(password)
+    except PasswordHasherBusy:
+        return jsonify({"message": "Server busy, please retry."}), 503
 
     new_user = User(
         username=username,
@@ -35,6 +38,7 @@ def register():
 
     db.session.add(new_user)
     db.session.commit()
+    recipient_directory.invalidate()
 
     return jsonify({
         "message": f"{role.capitalize()} registered successfully.",
@@ -55,8 +59,15 @@ def login():
 
     user = User.query.filter_by(email=email).first()
 
-    if not user or not bcrypt.check_password_hash(user.password_hash, password):
-        return jsonify({"message": "Invalid credentials"}), 401
+    try:
+        if not user or not password_hasher.check_password(user.password_hash, password):
+            return jsonify({"message": "Invalid credentials"}), 401
+    except PasswordHasherBusy:
+        return jsonify({"message": "Too many logins in progress, please retry."}), 503
+
+    # Upgrade hashes made at an old cost without delaying the response
+    if password_hasher.needs_rehash(user.password_hash):
+        password_hasher.rehash_later(current_app._get_current_object(), user.id, user.password_hash, password)
 
     # pass username into token generator so frontend can decode username
     access_token, refresh_token = generate_tokens(user.id, user.role, user.username)
@@ -98,7 +109,15 @@ def refresh_token():
 
 
 
-# LOGOUT (client-side only in JWT)
+# LOGOUT (revokes the presented access/refresh tokens in every worker)
 @auth_bp.route("/logout", methods=["POST"])
 def logout():
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        revoke_token(auth_header.split(" ")[1], Config.JWT_SECRET)
+
+    data = request.get_json(silent=True) or {}
+    if data.get("refresh_token"):
+        revoke_token(data["refresh_token"], Config.JWT_SECRET)
+
     return jsonify({"message": "Logout successful"}), 200
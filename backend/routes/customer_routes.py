@@ -55,9 +55,18 @@
 from flask import Blueprint, jsonify, request
 from models import db, Customer, Installation, Invoice
 from utils.auth_middleware import token_required
+from utils.projections import Projection, count_rows
 
 customer_bp = Blueprint("customers", __name__)
 
+CUSTOMER_LIST = Projection(Customer, [
+    ("id", Customer.id),
+    ("name", Customer.name),
+    ("email", Customer.email),
+    ("phone", Customer.phone),
+    ("status", Customer.status),
+])
+
 # 📌 List all customers (with optional status filter + pagination)
 @customer_bp.route("/customers", methods=["GET"])
 @token_required
@@ -66,30 +75,23 @@ def list_customers(current_user):
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("per_page", 10))
 
-    query = Customer.query
+    page = max(page, 1)
+    per_page = max(per_page, 1)
+
+    query = CUSTOMER_LIST.statement
     if status:
-        query = query.filter_by(status=status)
+        query = query.where(Customer.status == status)
 
-    pagination = query.order_by(Customer.id.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
+    total = count_rows(query)
+    rows = CUSTOMER_LIST.rows(
+        query.order_by(Customer.id.desc()).limit(per_page).offset((page - 1) * per_page)
     )
 
-    customers = [
-        {
-            "id": c.id,
-            "name": c.name,
-            "email": c.email,
-            "phone": c.phone,
-            "status": c.status,
-        }
-        for c in pagination.items
-    ]
-
     return jsonify({
-        "items": customers,
-        "total": pagination.total,
-        "page": pagination.page,
-        "pages": pagination.pages,
+        "items": [CUSTOMER_LIST.serialize(row) for row in rows],
+        "total": total,
+        "page": page,
+        "pages": -(-total // per_page),
     }), 200
 
 
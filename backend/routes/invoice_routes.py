@@ -1,96 +1,99 @@
 # backend/routes/invoice_routes.py
 from flask import Blueprint, request, jsonify
-from models import db, Invoice, Installation, Customer
+from models import Invoice
 from utils.decorators import role_required
+from utils.pagination import keyset_paginate
+from utils.streaming import collection_response
+from utils.invoices import (
+    INVOICE_ORDER, InvoiceError, invoice_listing, serialize_invoice_row,
+    create_invoice as create_invoice_record, update_invoice as update_invoice_record,
+    delete_invoice as delete_invoice_record,
+)
+from utils.summaries import invoice_summary as invoice_summary_totals
+from utils.response_cache import cached_response
 
+# The only /invoices routes: finance, admin and manager views all go through utils.invoices
 invoice_bp = Blueprint("invoice_bp", __name__)
 
-# GET all invoices (admin + finance)
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+# GET all invoices (admin + finance; managers get the status-only projection)
+# Without ?limit/?after/?before the full list is streamed (JSON array, or
+# NDJSON with ?format=ndjson); with them, a keyset page
+# {items, next_cursor, prev_cursor} is returned.
 @invoice_bp.route("/invoices", methods=["GET"])
-@role_required(["admin", "finance"])
+@role_required(["admin", "finance", "manager"])
 def get_invoices():
-    invoices = Invoice.query.all()
-    return jsonify([
-        {
-            "id": inv.id,
-            "amount": inv.amount,
-            "status": inv.status,
-            "installation_id": inv.installation_id,
-            "created_at": inv.created_at,
-            "installation": {
-                "id": inv.installation.id if inv.installation else None,
-                "package_type": inv.installation.package_type if inv.installation else None,
-                "customer_name": inv.installation.customer.name if inv.installation and inv.installation.customer else None,
-            }
-        }
-        for inv in invoices
-    ])
+    try:
+        query = invoice_listing(request.user.role, request.args)
+    except ValueError:
+        return jsonify({"message": "Invalid filter value"}), 400
+
+    if not any(k in request.args for k in ("limit", "after", "before")):
+        return collection_response(query.order_by(Invoice.id.desc()), serialize_invoice_row,
+                                   default_format="json-stream")
+
+    try:
+        limit = min(int(request.args.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"message": "limit must be positive"}), 400
+    try:
+        rows, next_cursor, prev_cursor = keyset_paginate(
+            query, INVOICE_ORDER, limit,
+            after=request.args.get("after"), before=request.args.get("before"),
+        )
+    except ValueError:
+        return jsonify({"message": "Invalid cursor"}), 400
+
+    return jsonify({
+        "items": [serialize_invoice_row(row) for row in rows],
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }), 200
 
 # POST create invoice
 @invoice_bp.route("/invoices", methods=["POST"])
 @role_required(["admin", "finance"])
 def create_invoice():
-    data = request.get_json()
-    installation_id = data.get("installation_id")
-    amount = data.get("amount")
-
-    # check installation exists & is completed
-    installation = Installation.query.get(installation_id)
-    if not installation:
-        return jsonify({"message": "Installation not found"}), 404
-    if installation.status != "Completed":
-        return jsonify({"message": "Installation must be completed before invoicing"}), 400
-    if Invoice.query.filter_by(installation_id=installation_id).first():
-        return jsonify({"message": "Invoice already exists for this installation"}), 400
-
-    invoice = Invoice(
-        amount=amount,
-        status="pending",
-        owner_id=data.get("owner_id"),  # finance/admin creating
-        installation_id=installation_id,
-    )
-    db.session.add(invoice)
-    db.session.commit()
+    data = request.get_json() or {}
+    try:
+        invoice = create_invoice_record(
+            data.get("installation_id"),
+            data.get("amount"),
+            owner_id=data.get("owner_id") or request.user.id,  # finance/admin creating
+        )
+    except InvoiceError as e:
+        return jsonify({"message": e.message}), e.status
     return jsonify({"message": "Invoice created", "invoice_id": invoice.id}), 201
 
-# PUT update invoice status
+# PUT update invoice status / amount
 @invoice_bp.route("/invoices/<int:invoice_id>", methods=["PUT"])
 @role_required(["admin", "finance"])
 def update_invoice(invoice_id):
-    invoice = Invoice.query.get(invoice_id)
-    if not invoice:
-        return jsonify({"message": "Invoice not found"}), 404
-
-    data = request.get_json()
-    invoice.status = data.get("status", invoice.status)
-    db.session.commit()
+    try:
+        update_invoice_record(invoice_id, request.get_json() or {})
+    except InvoiceError as e:
+        return jsonify({"message": e.message}), e.status
     return jsonify({"message": "Invoice updated"}), 200
 
 # DELETE invoice (admin only)
 @invoice_bp.route("/invoices/<int:invoice_id>", methods=["DELETE"])
 @role_required(["admin"])
 def delete_invoice(invoice_id):
-    invoice = Invoice.query.get(invoice_id)
-    if not invoice:
-        return jsonify({"message": "Invoice not found"}), 404
-
-    db.session.delete(invoice)
-    db.session.commit()
+    try:
+        delete_invoice_record(invoice_id)
+    except InvoiceError as e:
+        return jsonify({"message": e.message}), e.status
     return jsonify({"message": "Invoice deleted"}), 200
 
 # GET invoice summary (admin + finance)
 @invoice_bp.route("/invoices/summary", methods=["GET"])
 @role_required(["admin", "finance"])
+@cached_response("invoices")
 def invoice_summary():
-    total = db.session.query(db.func.sum(Invoice.amount)) \
-        .filter(Invoice.status == "paid").scalar() or 0
-    pending = Invoice.query.filter_by(status="pending").count()
-    paid = Invoice.query.filter_by(status="paid").count()
-    overdue = Invoice.query.filter_by(status="overdue").count()
-    return jsonify({
-        "total_revenue": total,
-        "pending": pending,
-        "paid": paid,
-        "overdue": overdue,
-    })
-
+    # One conditional-aggregation query, cached until the next invoice write
+    return jsonify(invoice_summary_totals())
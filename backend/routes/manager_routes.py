@@ -1,60 +1,108 @@
 # backend/routes/manager_routes.py
 from flask import Blueprint, request, jsonify
 from models import db, Installation, User, Customer, Invoice  # ✅ import Customer
-from utils.notifications import create_notifications_for_users
-from utils.auth_middleware import token_required
-from datetime import datetime
+from utils.notification_outbox import enqueue_notification
+from utils.auth_middleware import token_required, roles_allowed
+from utils.streaming import collection_response
+from utils.pagination import keyset_paginate
+from utils.invoices import date_to_condition
+from utils.projections import Projection, iso
+from utils.response_cache import cached_response
+from utils.schedule import ScheduleError, ensure_available, availability
+from utils.datetimes import naive_utc, parse_filter_datetime, parse_iso_datetime
+from config import Config
+from datetime import datetime, timedelta
 
 manager_bp = Blueprint("manager", __name__)
 
-def parse_iso_datetime(dt_str):
-    """Safely parse ISO 8601 datetime, handle 'Z' (UTC) suffix."""
-    if not dt_str:
-        return None
-    try:
-        if dt_str.endswith("Z"):
-            dt_str = dt_str.replace("Z", "+00:00")
-        return datetime.fromisoformat(dt_str)
-    except Exception:
-        return None
-
-
-# 🎯 GET all installations (with technician filtering)
+INSTALLATION_LIST = Projection(Installation, [
+    ("id", Installation.id),
+    ("customer_id", Installation.customer_id),
+    ("customer_name", Installation.customer_name),
+    ("package_type", Installation.package_type),
+    ("status", Installation.status),
+    ("technician_id", Installation.technician_id),
+    ("technician_name", User.username),
+    ("scheduled_date", Installation.scheduled_date, iso),
+    ("end_date", Installation.end_date, iso),
+    ("price", Installation.price),
+], joins=[(User, User.id == Installation.technician_id)])
+
+
+# Keyset orders: by id by default; by schedule when a date range is given (the range
+# drops unscheduled rows, whose NULL dates can't be seeked past). Both end in id, and the
+# schedule order is served by the (technician_id|status, scheduled_date, id) indexes.
+ID_ORDER = [(Installation.id, False)]
+SCHEDULE_ORDER = [(Installation.scheduled_date, False), (Installation.id, False)]
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def apply_installation_filters(query, args):
+    """
+    ?status= (comma-separated), ?technician_id=, ?package_type=,
+    ?date_from= / ?date_to= (ISO, inclusive range on scheduled_date; a bare
+    YYYY-MM-DD date_to covers that whole day). Raises ValueError on a malformed value.
+    """
+    if args.get("status"):
+        statuses = [s.strip() for s in args["status"].split(",") if s.strip()]
+        query = query.where(Installation.status.in_(statuses))
+    if args.get("technician_id"):
+        query = query.where(Installation.technician_id == int(args["technician_id"]))
+    if args.get("package_type"):
+        query = query.where(Installation.package_type == args["package_type"])
+    if args.get("date_from"):
+        query = query.where(Installation.scheduled_date >= parse_filter_datetime(args["date_from"]))
+    if args.get("date_to"):
+        query = query.where(date_to_condition(Installation.scheduled_date, args["date_to"]))
+    return query
+
+
+# 🎯 GET installations (technicians see only their own), filtered server-side.
+# Without ?limit/?after/?before the full list is streamed (?format=json-stream|ndjson);
+# with them, a keyset page {items, next_cursor, prev_cursor} is returned.
 @manager_bp.route("/installations", methods=["GET"])
 @token_required
+@roles_allowed("admin", "manager", "technician")
 def get_installations(current_user):
-    if current_user.role in ["admin", "manager"]:
-        installations = Installation.query.all()
-    elif current_user.role == "technician":
-        installations = Installation.query.filter_by(technician_id=current_user.id).all()
-    else:
-        return jsonify({"message": "Access forbidden"}), 403
+    try:
+        installations = apply_installation_filters(INSTALLATION_LIST.statement, request.args)
+    except ValueError:
+        return jsonify({"message": "Invalid filter value"}), 400
+    if current_user.role == "technician":
+        installations = installations.where(Installation.technician_id == current_user.id)
+
+    order = SCHEDULE_ORDER if request.args.get("date_from") or request.args.get("date_to") else ID_ORDER
+    if not any(k in request.args for k in ("limit", "after", "before")):
+        return collection_response(installations.order_by(*[column for column, _ in order]),
+                                   INSTALLATION_LIST.serialize)
+
+    try:
+        limit = min(int(request.args.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"message": "limit must be positive"}), 400
+    try:
+        rows, next_cursor, prev_cursor = keyset_paginate(
+            installations, order, limit,
+            after=request.args.get("after"), before=request.args.get("before"),
+        )
+    except ValueError:
+        return jsonify({"message": "Invalid cursor"}), 400
 
-    data = [
-        {
-            "id": i.id,
-            "customer_id": i.customer_id,
-            "customer_name": i.customer_name,
-            "package_type": i.package_type,
-            "status": i.status,
-            "technician_id": i.technician_id,
-            "technician_name": i.technician.username if i.technician else None,
-            "scheduled_date": i.scheduled_date.isoformat() if i.scheduled_date else None,
-            "end_date": i.end_date.isoformat() if i.end_date else None,
-            "price": i.price,
-        }
-        for i in installations
-    ]
-    return jsonify(data), 200
+    return jsonify({
+        "items": [INSTALLATION_LIST.serialize(row) for row in rows],
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }), 200
 
 
 # ✏️ CREATE new installation (with customer handling)
 @manager_bp.route("/installations", methods=["POST"])
 @token_required
+@roles_allowed("admin", "manager")
 def create_installation(current_user):
-    if current_user.role not in ["admin", "manager"]:
-        return jsonify({"message": "Access forbidden"}), 403
-
     data = request.get_json()
     customer_name = data.get("customer_name")
     customer_email = data.get("customer_email")  # 👈 new
@@ -97,6 +145,15 @@ def create_installation(current_user):
             return jsonify({"message": "Invalid technician ID"}), 400
 
 
+    # 🔹 Reject double-bookings for the technician (dates are stored as the naive UTC values checked here)
+    scheduled_date = naive_utc(parse_iso_datetime(scheduled_date))
+    end_date = naive_utc(parse_iso_datetime(end_date))
+    try:
+        ensure_available(technician_id or None, scheduled_date, end_date)
+    except ScheduleError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message, "conflict_id": e.conflict_id}), e.status
+
     # 🔹 Step 2: Create Installation with linked customer_id
     new_installation = Installation(
         customer_id=customer.id,
@@ -104,26 +161,20 @@ def create_installation(current_user):
         package_type=package_type,
         status=status,
         technician_id=technician_id,
-        scheduled_date=parse_iso_datetime(scheduled_date),
-        end_date=parse_iso_datetime(end_date),
+        scheduled_date=scheduled_date,
+        end_date=end_date,
         price=price,
     )
 
     db.session.add(new_installation)
-    db.session.commit()
-
-    to_notify = []
-    roles = ["admin", "manager", "finance"]
-    users = User.query.filter(User.role.in_(roles)).all()
-    to_notify.extend([u.id for u in users])
-
-    if technician_id:
-        to_notify.append(technician_id)
+    db.session.flush()  # need the id for the notification
 
+    # Delivered by the outbox worker once this transaction commits
     msg = f"New Installation #{new_installation.id} — {new_installation.package_type} for {customer_name}"
-    create_notifications_for_users(to_notify, msg, object_type="installation", object_id=new_installation.id)
+    enqueue_notification(msg, roles=["admin", "manager", "finance"], user_ids=[technician_id],
+                         object_type="installation", object_id=new_installation.id)
 
-    
+    db.session.commit()
 
     return jsonify({
         "message": "Installation created",
@@ -137,6 +188,7 @@ def create_installation(current_user):
 # ✏️ UPDATE installation (assign technician, update status, reschedule, price)
 @manager_bp.route("/installations/<int:installation_id>", methods=["PUT"])
 @token_required
+@roles_allowed("admin", "manager", "technician")
 def update_installation(current_user, installation_id):
     installation = Installation.query.get(installation_id)
     if not installation:
@@ -166,9 +218,18 @@ def update_installation(current_user, installation_id):
         scheduled_date = data.get("scheduled_date")
         end_date = data.get("end_date")
         if scheduled_date:
-            installation.scheduled_date = parse_iso_datetime(scheduled_date)
+            installation.scheduled_date = naive_utc(parse_iso_datetime(scheduled_date))
         if end_date:
-            installation.end_date = parse_iso_datetime(end_date)
+            installation.end_date = naive_utc(parse_iso_datetime(end_date))
+
+        # 🔹 Reject double-bookings when the technician or the slot changes
+        if installation.technician_id != old_tech or scheduled_date or end_date:
+            try:
+                ensure_available(installation.technician_id, installation.scheduled_date,
+                                 installation.end_date, exclude_id=installation.id)
+            except ScheduleError as e:
+                db.session.rollback()
+                return jsonify({"message": e.message, "conflict_id": e.conflict_id}), e.status
 
         # Price validation
         if "price" in data:
@@ -181,15 +242,12 @@ def update_installation(current_user, installation_id):
                 return jsonify({"message": "Invalid price format"}), 400
 
     # --- Technician updates ---
-    elif current_user.role == "technician":
+    else:
         if installation.technician_id != current_user.id:
             return jsonify({"message": "Access forbidden: not your job"}), 403
         if "status" in data:
             installation.status = data["status"]
 
-    else:
-        return jsonify({"message": "Access forbidden"}), 403
-
     # --- Auto actions when marked Completed ---
     if old_status != "Completed" and installation.status == "Completed":
         # 1. Generate invoice (only if not exists)
@@ -207,32 +265,25 @@ def update_installation(current_user, installation_id):
         if installation.customer and installation.customer.status.lower() == "lead":
             installation.customer.status = "active"
 
-    db.session.commit()
-
-    # --- Notifications ---
-    to_notify = []
+    # --- Notifications (enqueued in the same transaction, delivered after commit) ---
 
     # Case 1: Technician starts job
     if current_user.role == "technician" and old_status != "In Progress" and installation.status == "In Progress":
-        roles = ["admin", "manager", "finance"]
-        users = User.query.filter(User.role.in_(roles)).all()
-        to_notify = [u.id for u in users]
         msg = f"Installation #{installation.id} started by Technician {current_user.username}"
-        create_notifications_for_users(to_notify, msg, object_type="installation", object_id=installation.id)
+        enqueue_notification(msg, roles=["admin", "manager", "finance"], object_type="installation", object_id=installation.id)
 
     # Case 2: Admin/Manager assigns/reassigns technician
     if current_user.role in ["admin", "manager"] and old_tech != installation.technician_id:
         if installation.technician_id:
             msg = f"You have been assigned Installation #{installation.id}"
-            create_notifications_for_users([installation.technician_id], msg, object_type="installation", object_id=installation.id)
+            enqueue_notification(msg, user_ids=[installation.technician_id], object_type="installation", object_id=installation.id)
 
     # Case 3: Completed installation
     if old_status != "Completed" and installation.status == "Completed":
-        roles = ["admin", "manager", "finance"]
-        users = User.query.filter(User.role.in_(roles)).all()
-        to_notify = [u.id for u in users]
         msg = f"Installation #{installation.id} has been marked Completed"
-        create_notifications_for_users(to_notify, msg, object_type="installation", object_id=installation.id)
+        enqueue_notification(msg, roles=["admin", "manager", "finance"], object_type="installation", object_id=installation.id)
+
+    db.session.commit()
 
     return jsonify({"message": "Installation updated"}), 200
 
@@ -243,10 +294,8 @@ def update_installation(current_user, installation_id):
 # ❌ DELETE installation
 @manager_bp.route("/installations/<int:installation_id>", methods=["DELETE"])
 @token_required
+@roles_allowed("admin")  # Only Admins can delete
 def delete_installation(current_user, installation_id):
-    if current_user.role != "admin":  # Only Admins can delete
-        return jsonify({"message": "Access forbidden"}), 403
-
     installation = Installation.query.get(installation_id)
     if not installation:
         return jsonify({"message": "Installation not found"}), 404
@@ -259,12 +308,36 @@ def delete_installation(current_user, installation_id):
 # ✅ GET all technicians (for assignment dropdown)
 @manager_bp.route("/technicians", methods=["GET"])
 @token_required
+@roles_allowed("admin", "manager")
+@cached_response("users")
 def get_technicians(current_user):
-    if current_user.role not in ["admin", "manager"]:
-        return jsonify({"message": "Access forbidden"}), 403
-
     technicians = User.query.filter_by(role="technician").all()
     return jsonify([
         {"id": t.id, "username": t.username, "email": t.email}
         for t in technicians
     ]), 200
+
+
+# 📅 Technician availability: bookings and free gaps in ?from= / ?to= (ISO; default the next 7 days)
+@manager_bp.route("/technicians/<int:technician_id>/availability", methods=["GET"])
+@token_required
+@roles_allowed("admin", "manager", "technician")
+def get_technician_availability(current_user, technician_id):
+    if current_user.role == "technician" and current_user.id != technician_id:
+        return jsonify({"message": "Access forbidden"}), 403
+    tech = db.session.get(User, technician_id)
+    if not tech or tech.role != "technician":
+        return jsonify({"message": "Technician not found"}), 404
+
+    start = naive_utc(parse_iso_datetime(request.args["from"])) if request.args.get("from") else datetime.utcnow()
+    if start is None:
+        return jsonify({"message": "from must be an ISO 8601 datetime"}), 400
+    end = naive_utc(parse_iso_datetime(request.args["to"])) if request.args.get("to") else start + timedelta(days=7)
+    if end is None:
+        return jsonify({"message": "to must be an ISO 8601 datetime"}), 400
+    if end <= start:
+        return jsonify({"message": "to must be after from"}), 400
+    if end - start > timedelta(days=Config.SCHEDULE_MAX_WINDOW_DAYS):
+        return jsonify({"message": f"Window cannot exceed {Config.SCHEDULE_MAX_WINDOW_DAYS} days"}), 400
+
+    return jsonify(availability(technician_id, start, end)), 200
@@ -1,6 +1,6 @@
 # from flask import Blueprint, jsonify, request
 # from utils.auth_middleware import token_required
-# from models import db, Notification
+# from models import Notification
 
 # notification_bp = Blueprint("notifications", __name__)
 
@@ -63,59 +63,101 @@
 #     return jsonify({"message": "All notifications marked as read"}), 200
 
 #backend/routes/notification_routes.py
-from flask import Blueprint, jsonify, request
-from utils.auth_middleware import token_required
-from models import db, Notification
+import json
+import threading
+import time
+from flask import Blueprint, Response, jsonify, request, g
+from utils.auth_middleware import token_required, accepts_query_token
+from utils.notification_broker import broker
+from config import Config
+from models import Notification
+from utils.pagination import keyset_paginate
+from utils.notifications import get_unread_count, mark_notification_read, mark_all_notifications_read
 
 notification_bp = Blueprint("notifications", __name__)
 
+MAX_PER_PAGE = 100
+
+# Open /notifications/stream connections allowed in this worker process
+_stream_slots = threading.BoundedSemaphore(Config.NOTIFICATION_STREAM_MAX_CONNECTIONS)
+
+# Newest first; id breaks ties. Matches ix_notifications_user_created_id.
+NOTIFICATION_ORDER = [(Notification.created_at, True), (Notification.id, False)]
+
+
+def serialize_notification(n):
+    return {
+        "id": n.id,
+        "message": n.message,
+        "object_type": n.object_type,
+        "object_id": n.object_id,
+        "is_read": n.is_read,
+        "created_at": n.created_at.isoformat()
+    }
+
+
 # 📌 List notifications
+# ?page=N keeps the old OFFSET + COUNT behaviour; otherwise keyset mode
+# with ?after=<cursor> / ?before=<cursor> and no COUNT unless ?with_total=1.
 @notification_bp.route("/notifications", methods=["GET"])
 @token_required
 def list_notifications(current_user):
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 10))
-
-    pagination = Notification.query.filter_by(user_id=current_user.id) \
-        .order_by(Notification.created_at.desc()) \
-        .paginate(page=page, per_page=per_page, error_out=False)
-
-    data = [
-        {
-            "id": n.id,
-            "message": n.message,
-            "object_type": n.object_type,
-            "object_id": n.object_id,
-            "is_read": n.is_read,
-            "created_at": n.created_at.isoformat()
-        }
-        for n in pagination.items
-    ]
-    return jsonify({
-        "items": data,
-        "total": pagination.total,
-        "page": pagination.page,
-        "pages": pagination.pages
-    }), 200
+    try:
+        per_page = min(int(request.args.get("per_page", 10)), MAX_PER_PAGE)
+    except ValueError:
+        return jsonify({"message": "per_page must be an integer"}), 400
+    if per_page < 1:
+        return jsonify({"message": "per_page must be positive"}), 400
+    query = Notification.query.filter_by(user_id=current_user.id)
+
+    if "page" in request.args:
+        try:
+            page = int(request.args.get("page", 1))
+        except ValueError:
+            return jsonify({"message": "page must be an integer"}), 400
+        if page < 1:
+            return jsonify({"message": "page must be positive"}), 400
+        pagination = query.order_by(Notification.created_at.desc()) \
+            .paginate(page=page, per_page=per_page, error_out=False)
+
+        return jsonify({
+            "items": [serialize_notification(n) for n in pagination.items],
+            "total": pagination.total,
+            "page": pagination.page,
+            "pages": pagination.pages
+        }), 200
+
+    try:
+        items, next_cursor, prev_cursor = keyset_paginate(
+            query, NOTIFICATION_ORDER, per_page,
+            after=request.args.get("after"), before=request.args.get("before"),
+        )
+    except ValueError:
+        return jsonify({"message": "Invalid cursor"}), 400
+
+    data = {
+        "items": [serialize_notification(n) for n in items],
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+    if request.args.get("with_total") in ("1", "true"):
+        data["total"] = query.count()
+    return jsonify(data), 200
 
 
 # 📌 Unread count
 @notification_bp.route("/notifications/unread_count", methods=["GET"])
 @token_required
 def unread_count(current_user):
-    count = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
-    return jsonify({"unread": count}), 200
+    return jsonify({"unread": get_unread_count(current_user.id)}), 200
 
 
 # 📌 Mark single notification as read
 @notification_bp.route("/notifications/read/<int:notif_id>", methods=["POST"])
 @token_required
 def mark_read(current_user, notif_id):
-    notif = Notification.query.filter_by(id=notif_id, user_id=current_user.id).first()
-    if not notif:
+    if not mark_notification_read(current_user.id, notif_id):
         return jsonify({"message": "Not found"}), 404
-    notif.is_read = True
-    db.session.commit()
     return jsonify({"message": "Notification marked as read"}), 200
 
 
@@ -123,6 +165,47 @@ def mark_read(current_user, notif_id):
 @notification_bp.route("/notifications/read_all", methods=["POST"])
 @token_required
 def mark_all_read(current_user):
-    Notification.query.filter_by(user_id=current_user.id, is_read=False).update({"is_read": True})
-    db.session.commit()
+    mark_all_notifications_read(current_user.id)
     return jsonify({"message": "All notifications marked as read"}), 200
+
+
+# 📡 Live notifications (Server-Sent Events)
+# EventSource can't set headers, so ?access_token=... is accepted here.
+# The stream ends when the token expires (or after NOTIFICATION_STREAM_MAX_SECONDS);
+# the client reconnects with a fresh token and reloads the list.
+@notification_bp.route("/notifications/stream", methods=["GET"])
+@token_required
+@accepts_query_token
+def stream_notifications(current_user):
+    # Each open stream holds a request thread; past the cap, refuse instead of starving the API
+    if not _stream_slots.acquire(blocking=False):
+        response = jsonify({"message": "Too many open notification streams; retry shortly"})
+        response.headers["Retry-After"] = str(Config.NOTIFICATION_STREAM_HEARTBEAT)
+        return response, 503
+
+    deadline = min(time.time() + Config.NOTIFICATION_STREAM_MAX_SECONDS, g.auth_claims["exp"])
+
+    subscription = broker.subscribe(current_user.id)
+
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            while time.time() < deadline:
+                event = subscription.get(timeout=Config.NOTIFICATION_STREAM_HEARTBEAT)
+                if subscription.take_dropped():
+                    # Buffer overflowed: tell the client to refetch instead of trusting the stream
+                    yield "event: resync\ndata: {}\n\n"
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: notification\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    # Runs when the server closes the response, even if the client left before the first event
+    response.call_on_close(_stream_slots.release)
+    return response
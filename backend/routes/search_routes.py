@@ -1,11 +1,17 @@
 # backend/routes/search_routes.py
 
 from flask import Blueprint, request, jsonify
-from models import db, User, Customer, Installation, Invoice, Ticket
 from utils.auth_middleware import token_required
+from utils.search import SEARCH_ENTITIES, search_backend
+from utils.streaming import requested_stream_format, stream_sections
+from utils.suggest import suggest_service
+from config import Config
 
 search_bp = Blueprint("search", __name__)
 
+# ?q= (at least SEARCH_MIN_QUERY chars), ?types=customers,users,... (default: all),
+# ?limit= / ?offset= per entity. Each entity list is capped; the X-Search-Has-More header
+# lists the entities that have further results (kept out of the body, whose keys are all lists).
 @search_bp.route("/search", methods=["GET"])
 @token_required
 def global_search(current_user):
@@ -13,59 +19,55 @@ def global_search(current_user):
 
     if not q:
         return jsonify({"message": "Query is required"}), 400
+    if len(q) < Config.SEARCH_MIN_QUERY:
+        return jsonify({"message": f"Query must be at least {Config.SEARCH_MIN_QUERY} characters"}), 400
 
-    # 🔎 Customers
-    customers = Customer.query.filter(
-        (Customer.name.ilike(f"%{q}%")) |
-        (Customer.email.ilike(f"%{q}%")) |
-        (Customer.phone.ilike(f"%{q}%"))
-    ).all()
+    entities = SEARCH_ENTITIES
+    if request.args.get("types"):
+        wanted = {t.strip() for t in request.args["types"].split(",") if t.strip()}
+        unknown = wanted - {entity.name for entity in SEARCH_ENTITIES}
+        if unknown:
+            return jsonify({"message": f"Unknown types: {', '.join(sorted(unknown))}"}), 400
+        entities = [entity for entity in SEARCH_ENTITIES if entity.name in wanted]
 
-    # 🔎 Users (admins, managers, technicians, finance)
-    users = User.query.filter(
-        (User.username.ilike(f"%{q}%")) |
-        (User.email.ilike(f"%{q}%")) |
-        (User.role.ilike(f"%{q}%"))
-    ).all()
+    try:
+        limit = min(int(request.args.get("limit", Config.SEARCH_DEFAULT_LIMIT)), Config.SEARCH_MAX_LIMIT)
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"message": "limit and offset must be integers"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"message": "limit must be positive and offset non-negative"}), 400
 
-    # 🔎 Installations
-    installations = Installation.query.filter(
-        (Installation.customer_name.ilike(f"%{q}%")) |
-        (Installation.package_type.ilike(f"%{q}%")) |
-        (Installation.status.ilike(f"%{q}%"))
-    ).all()
+    # 🔎 Customers, users, installations, invoices, tickets -- ranked, index-backed where the
+    # database supports it, one query per entity in parallel (utils/search.py)
+    results = search_backend().search(q, entities, limit + 1, offset)
+    has_more = ",".join(entity.name for entity in entities if len(results[entity.name]) > limit)
+    sections = [(entity.name, results[entity.name][:limit], dict) for entity in entities]
 
-    # 🔎 Invoices
-    invoices = Invoice.query.filter(
-        (Invoice.status.ilike(f"%{q}%"))
-    ).all()
+    # ?format=json-stream|ndjson streams each result set
+    fmt = requested_stream_format()
+    if fmt:
+        response = stream_sections(sections, fmt)
+    else:
+        response = jsonify({name: rows for name, rows, _ in sections})
+    response.headers["X-Search-Has-More"] = has_more
+    return response, 200
 
-    # 🔎 Tickets
-    tickets = Ticket.query.filter(
-        (Ticket.issue.ilike(f"%{q}%")) |
-        (Ticket.status.ilike(f"%{q}%"))
-    ).all()
 
-    # Format response
-    return jsonify({
-        "customers": [
-            {"id": c.id, "name": c.name, "email": c.email, "phone": c.phone}
-            for c in customers
-        ],
-        "users": [
-            {"id": u.id, "username": u.username, "email": u.email, "role": u.role}
-            for u in users
-        ],
-        "installations": [
-            {"id": i.id, "customer_name": i.customer_name, "package_type": i.package_type, "status": i.status, "price": i.price}
-            for i in installations
-        ],
-        "invoices": [
-            {"id": inv.id, "amount": inv.amount, "status": inv.status}
-            for inv in invoices
-        ],
-        "tickets": [
-            {"id": t.id, "issue": t.issue, "status": t.status}
-            for t in tickets
-        ]
-    }), 200
+# ⌨️ Typeahead: ?q= prefix (any length), ?limit= (default SUGGEST_DEFAULT_LIMIT).
+# Served from the in-memory prefix index + prefix LRU (utils/suggest.py), no per-keystroke table scans.
+@search_bp.route("/search/suggest", methods=["GET"])
+@token_required
+def search_suggest(current_user):
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"q": q, "suggestions": []}), 200
+
+    try:
+        limit = min(int(request.args.get("limit", Config.SUGGEST_DEFAULT_LIMIT)), Config.SUGGEST_MAX_LIMIT)
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"message": "limit must be positive"}), 400
+
+    return jsonify({"q": q, "suggestions": suggest_service.suggest(q, limit)}), 200
@@ -1,12 +1,11 @@
 from main import create_app, db
 from models import User, Customer, Installation, Invoice, Ticket
-from flask_bcrypt import Bcrypt
+from utils.passwords import password_hasher
 from datetime import datetime, timedelta
 import calendar
 import random
 
 app = create_app()
-bcrypt = Bcrypt()
 
 with app.app_context():
     # --- USERS ---
@@ -23,7 +22,7 @@ with app.app_context():
             user = User(
                 username=username,
                 email=email,
-                password_hash=bcrypt.generate_password_hash(password).decode("utf-8"),
+                password_hash=password_hasher.hash_password(password),
                 role=role,
             )
             db.session.add(user)
@@ -0,0 +1,93 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures. Run from backend/:  python -m pytest
+
+Each test gets fresh tables in a throwaway SQLite file and empty in-process
+caches; the background workers are disabled so tests drive them directly.
+"""
+import os
+import sys
+import tempfile
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="backend-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.setdefault("JWT_SECRET", "test-secret-test-secret-test-secret")
+os.environ.setdefault("JWT_REFRESH_SECRET", "test-refresh-test-refresh-test-refresh")
+os.environ["BCRYPT_LOG_ROUNDS"] = "4"
+os.environ["NOTIFICATION_OUTBOX_WORKER"] = "false"
+os.environ["ASSIGNMENT_WORKER"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from types import SimpleNamespace
+
+import pytest
+from flask import g
+from sqlalchemy import event
+
+from main import create_app
+from extensions import bcrypt
+from models import db, User
+from utils.jwt_utils import generate_tokens, token_cache
+from utils.principal_cache import principal_cache
+from utils.recipient_directory import recipient_directory
+from utils.response_cache import response_cache
+from utils.suggest import suggest_service
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+
+    # Requests reuse the test's app context, so `g` (e.g. the memoized auth result)
+    # would outlive a request; in production every request gets a fresh one
+    @app.teardown_request
+    def _fresh_g(_):
+        for name in list(g):
+            g.pop(name)
+
+    # Enforce foreign keys like PostgreSQL does
+    with app.app_context():
+        @event.listens_for(db.engine, "connect")
+        def _foreign_keys(dbapi_connection, _):
+            dbapi_connection.execute("PRAGMA foreign_keys=ON")
+    return app
+
+
+@pytest.fixture(autouse=True)
+def app_ctx(app):
+    with app.app_context():
+        db.engine.dispose()
+        db.create_all()
+        token_cache.reset()
+        principal_cache.clear()
+        recipient_directory.invalidate()
+        if response_cache.enabled:
+            response_cache.backend.clear()
+        suggest_service.invalidate()
+        yield
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users():
+    """One user per role, as plain objects (id, role, username) safe to use outside a session."""
+    created = {}
+    for name, role in (("admin", "admin"), ("mgr", "manager"), ("fin", "finance"), ("tech", "technician")):
+        user = User(username=name, email=f"{name}@example.com", role=role,
+                    password_hash=bcrypt.generate_password_hash("pw").decode())
+        db.session.add(user)
+        db.session.commit()
+        created[role] = SimpleNamespace(id=user.id, role=user.role, username=user.username)
+    return SimpleNamespace(**created)
+
+
+def auth(user):
+    """Authorization header for `user`."""
+    return {"Authorization": "Bearer " + generate_tokens(user.id, user.role, user.username)[0]}
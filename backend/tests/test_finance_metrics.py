@@ -0,0 +1,60 @@
+# backend/tests/test_finance_metrics.py
+from datetime import datetime
+from sqlalchemy import event
+from models import db, Customer, FinanceRollup, Installation, Invoice
+from utils.finance_metrics import load_rollups, rebuild_rollups
+
+
+def _installation(status="Scheduled", package_type="Core"):
+    customer = Customer(name="Ada", email=f"ada{Customer.query.count()}@example.com", status="lead")
+    db.session.add(customer)
+    db.session.flush()
+    installation = Installation(customer_id=customer.id, customer_name=customer.name,
+                                package_type=package_type, status=status)
+    db.session.add(installation)
+    db.session.flush()
+    return installation
+
+
+def _snapshot():
+    return {(r.dimension, r.key): (r.count, round(r.amount, 2)) for r in FinanceRollup.query if r.count}
+
+
+def test_rollups_match_a_full_rebuild(users):
+    first = _installation(status="Completed")
+    second = _installation(package_type="Plus")
+    db.session.add_all([
+        Invoice(amount=100, status="paid", installation_id=first.id, customer_id=first.customer_id,
+                created_at=datetime(2026, 3, 5)),
+        Invoice(amount=40, status="pending", installation_id=second.id, customer_id=second.customer_id),
+    ])
+    db.session.commit()
+    first.technician_id = users.technician.id
+    second.status = "Completed"
+    db.session.commit()
+
+    maintained = _snapshot()
+    rebuild_rollups()
+    assert maintained == _snapshot()
+    assert load_rollups("package")["package"] == {"Core": (1, 100.0)}
+
+
+def test_new_rollup_row_created_concurrently_is_added_to(users):
+    """Another transaction inserts the same new (dimension, key) first; the flush must still land."""
+    fired = []
+
+    def insert_first(conn, cursor, statement, parameters, context, executemany):
+        if not fired and statement.startswith("INSERT INTO finance_rollups"):
+            fired.append(True)
+            cursor.execute("INSERT INTO finance_rollups (dimension, key, count, amount) "
+                           "VALUES ('installation_status', 'Scheduled', 1, 0)")
+
+    event.listen(db.engine, "before_cursor_execute", insert_first)
+    try:
+        _installation()
+        db.session.commit()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", insert_first)
+
+    assert fired
+    assert load_rollups("installation_status")["installation_status"] == {"Scheduled": (2, 0.0)}
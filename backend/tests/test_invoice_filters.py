@@ -0,0 +1,53 @@
+# backend/tests/test_invoice_filters.py
+from datetime import datetime
+import pytest
+from models import db, Customer, Installation, Invoice
+from tests.conftest import auth
+
+
+@pytest.fixture
+def invoices(users):
+    """Invoices created at 09:00, 11:00 and 23:30 UTC on 2026-03-05; ids in that order."""
+    customer = Customer(name="Ada", email="ada@example.com", status="active")
+    db.session.add(customer)
+    db.session.flush()
+    ids = []
+    for hour, minute in ((9, 0), (11, 0), (23, 30)):
+        installation = Installation(customer_id=customer.id, customer_name=customer.name,
+                                    package_type="Core", status="Completed")
+        db.session.add(installation)
+        db.session.flush()
+        invoice = Invoice(amount=100, status="paid", installation_id=installation.id, customer_id=customer.id,
+                          created_at=datetime(2026, 3, 5, hour, minute))
+        db.session.add(invoice)
+        db.session.flush()
+        ids.append(invoice.id)
+    db.session.commit()
+    return ids
+
+
+def _ids(client, user, **params):
+    response = client.get("/api/invoices", headers=auth(user), query_string={"limit": 50, **params})
+    assert response.status_code == 200
+    return sorted(item["id"] for item in response.get_json()["items"])
+
+
+def test_utc_z_suffix_is_accepted(client, users, invoices):
+    assert _ids(client, users.finance, date_from="2026-03-05T10:00:00Z") == invoices[1:]
+    assert _ids(client, users.finance, date_to="2026-03-05T10:00:00Z") == invoices[:1]
+
+
+def test_offsets_are_normalised_to_utc(client, users, invoices):
+    # 12:00+02:00 is 10:00 UTC
+    assert _ids(client, users.finance, date_from="2026-03-05T12:00:00+02:00") == invoices[1:]
+    assert _ids(client, users.finance, date_to="2026-03-05T12:00:00+02:00") == invoices[:1]
+
+
+def test_bare_date_to_covers_the_whole_day(client, users, invoices):
+    assert _ids(client, users.finance, date_from="2026-03-05", date_to="2026-03-05") == invoices
+
+
+@pytest.mark.parametrize("params", [{"date_from": "yesterday"}, {"date_to": "2026-13-01"}])
+def test_malformed_dates_are_a_400(client, users, invoices, params):
+    response = client.get("/api/invoices", headers=auth(users.finance), query_string=params)
+    assert response.status_code == 400
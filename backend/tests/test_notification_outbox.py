@@ -0,0 +1,49 @@
+# backend/tests/test_notification_outbox.py
+from models import db, Notification, NotificationOutbox, User
+from utils.notification_outbox import drain_outbox, enqueue_notification
+from utils.recipient_directory import recipient_directory
+
+
+def _messages(user_id):
+    return [n.message for n in Notification.query.filter_by(user_id=user_id)]
+
+
+def test_role_fanout_skips_user_deleted_by_another_worker(users):
+    # Warm the directory, then delete a role member behind its back (as another worker would)
+    assert users.technician.id in recipient_directory.recipients_for(["technician"])
+    gone = User(username="tech2", email="tech2@example.com", password_hash="x", role="technician")
+    db.session.add(gone)
+    db.session.commit()
+    recipient_directory.invalidate()
+    recipient_directory.recipients_for(["technician"])
+    db.session.delete(gone)
+    db.session.commit()
+
+    enqueue_notification("hello", roles=["technician"])
+    db.session.commit()
+
+    assert drain_outbox() == 1
+    assert _messages(users.technician.id) == ["hello"]
+    assert NotificationOutbox.query.one().attempts == 0
+
+
+def test_failing_entry_does_not_block_the_batch(users):
+    enqueue_notification("broken", user_ids=[users.manager.id])
+    enqueue_notification("fine", user_ids=[users.manager.id])
+    db.session.commit()
+    NotificationOutbox.query.filter_by(message="broken").update({"extra": "{not json"})
+    db.session.commit()
+
+    assert drain_outbox(max_attempts=1) == 1
+    assert _messages(users.manager.id) == ["fine"]
+    broken = NotificationOutbox.query.filter_by(message="broken").one()
+    assert broken.attempts == 1 and broken.processed_at is not None and broken.last_error
+
+
+def test_explicit_recipients_that_no_longer_exist_are_dropped(users):
+    enqueue_notification("assigned", user_ids=[users.technician.id, 9999])
+    db.session.commit()
+
+    assert drain_outbox() == 1
+    assert _messages(users.technician.id) == ["assigned"]
+    assert Notification.query.count() == 1
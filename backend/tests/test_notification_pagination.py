@@ -0,0 +1,60 @@
+# backend/tests/test_notification_pagination.py
+from datetime import datetime, timedelta
+import pytest
+from models import db, Notification
+from tests.conftest import auth
+
+
+@pytest.fixture
+def notifications(users):
+    """Seven notifications for the manager, newest first; two share a timestamp."""
+    base = datetime(2026, 3, 1, 12, 0)
+    stamps = [base - timedelta(minutes=m) for m in (0, 1, 1, 2, 3, 4, 5)]
+    rows = [Notification(user_id=users.manager.id, message=f"n{i}", created_at=stamp)
+            for i, stamp in enumerate(stamps)]
+    db.session.add_all(rows)
+    db.session.commit()
+    # created_at DESC, id ASC
+    return [n.id for n in sorted(rows, key=lambda n: (-n.created_at.timestamp(), n.id))]
+
+
+def _page(client, user, **params):
+    response = client.get("/api/notifications", headers=auth(user), query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_next_cursor_walks_every_notification_once_in_order(client, users, notifications):
+    seen, params = [], {"per_page": 3}
+    while True:
+        page = _page(client, users.manager, **params)
+        seen.extend(item["id"] for item in page["items"])
+        if not page["next_cursor"]:
+            break
+        params = {"per_page": 3, "after": page["next_cursor"]}
+    assert seen == notifications
+
+
+def test_prev_cursor_returns_to_the_previous_page(client, users, notifications):
+    first = _page(client, users.manager, per_page=3)
+    second = _page(client, users.manager, per_page=3, after=first["next_cursor"])
+    back = _page(client, users.manager, per_page=3, before=second["prev_cursor"])
+
+    assert [item["id"] for item in second["items"]] == notifications[3:6]
+    assert [item["id"] for item in back["items"]] == [item["id"] for item in first["items"]]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzFd", "WyJ4IiwgMV0"])
+def test_malformed_cursor_is_a_400(client, users, notifications, cursor):
+    response = client.get("/api/notifications", headers=auth(users.manager), query_string={"after": cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("params", [
+    {"per_page": "ten"}, {"per_page": "0"}, {"per_page": "-3"},
+    {"page": "x"}, {"page": "0"},
+])
+def test_bad_page_size_or_number_is_a_400(client, users, params):
+    response = client.get("/api/notifications", headers=auth(users.manager), query_string=params)
+    assert response.status_code == 400
+    assert response.get_json()["message"]
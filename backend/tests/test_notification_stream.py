@@ -0,0 +1,33 @@
+# backend/tests/test_notification_stream.py
+import threading
+import routes.notification_routes as notification_routes
+from tests.conftest import auth
+
+
+def test_streams_over_the_per_worker_cap_get_503(client, users, monkeypatch):
+    monkeypatch.setattr(notification_routes, "_stream_slots", threading.BoundedSemaphore(1))
+
+    first = client.get("/api/notifications/stream", headers=auth(users.manager), buffered=False)
+    assert first.status_code == 200
+    assert next(first.response) == b"retry: 5000\n\n"
+
+    refused = client.get("/api/notifications/stream", headers=auth(users.technician), buffered=False)
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"]
+    # Ordinary requests are unaffected
+    assert client.get("/api/notifications/unread_count", headers=auth(users.technician)).status_code == 200
+
+    first.close()
+    again = client.get("/api/notifications/stream", headers=auth(users.technician), buffered=False)
+    assert again.status_code == 200
+    again.close()
+
+
+def test_slot_is_released_when_the_client_leaves_before_the_first_event(client, users, monkeypatch):
+    monkeypatch.setattr(notification_routes, "_stream_slots", threading.BoundedSemaphore(1))
+
+    client.get("/api/notifications/stream", headers=auth(users.manager), buffered=False).close()
+
+    again = client.get("/api/notifications/stream", headers=auth(users.manager), buffered=False)
+    assert again.status_code == 200
+    again.close()
@@ -0,0 +1,77 @@
+# backend/tests/test_schedule.py
+from datetime import datetime
+from models import db, Customer, Installation
+from tests.conftest import auth
+
+
+def _book(client, user, technician_id, start, end=None):
+    body = {"customer_name": "Ada", "customer_email": "ada@example.com", "package_type": "Core",
+            "technician_id": technician_id, "scheduled_date": start}
+    if end:
+        body["end_date"] = end
+    return client.post("/api/installations", json=body, headers=auth(user))
+
+
+def _legacy(technician_id, start, end):
+    """A booking written directly, as rows saved before the overlap check existed were."""
+    customer = Customer.query.first() or Customer(name="Legacy", email="legacy@example.com", status="lead")
+    db.session.add(customer)
+    db.session.flush()
+    db.session.add(Installation(customer_id=customer.id, customer_name=customer.name, package_type="Core",
+                                status="Scheduled", technician_id=technician_id, scheduled_date=start, end_date=end))
+    db.session.commit()
+
+
+def test_overlapping_booking_is_rejected(client, users):
+    assert _book(client, users.manager, users.technician.id, "2026-03-01T09:00:00Z", "2026-03-01T12:00:00Z").status_code == 201
+    assert _book(client, users.manager, users.technician.id, "2026-03-01T12:00:00Z", "2026-03-01T14:00:00Z").status_code == 201
+
+    response = _book(client, users.manager, users.technician.id, "2026-03-01T11:00:00Z", "2026-03-01T13:00:00Z")
+    assert response.status_code == 409
+    assert response.json["conflict_id"] == 1
+
+
+def test_booking_without_end_blocks_the_default_duration(client, users):
+    assert _book(client, users.manager, users.technician.id, "2026-03-01T09:00:00Z").status_code == 201
+    assert _book(client, users.manager, users.technician.id, "2026-03-01T12:00:00Z").status_code == 409
+    assert _book(client, users.manager, users.technician.id, "2026-03-01T13:00:00Z").status_code == 201
+
+
+def test_overlap_hidden_behind_a_shorter_legacy_booking(client, users):
+    _legacy(users.technician.id, datetime(2026, 4, 1, 9), datetime(2026, 4, 1, 17))
+    _legacy(users.technician.id, datetime(2026, 4, 1, 10), datetime(2026, 4, 1, 11))
+
+    assert _book(client, users.manager, users.technician.id, "2026-04-01T12:00:00Z", "2026-04-01T13:00:00Z").status_code == 409
+    assert _book(client, users.manager, users.technician.id, "2026-04-01T17:00:00Z", "2026-04-01T18:00:00Z").status_code == 201
+
+
+def test_offset_datetimes_are_stored_as_the_checked_utc_interval(client, users):
+    response = _book(client, users.manager, users.technician.id, "2026-05-01T11:00:00+02:00", "2026-05-01T13:00:00+02:00")
+    assert response.status_code == 201
+    installation = db.session.get(Installation, response.json["id"])
+    assert (installation.scheduled_date, installation.end_date) == (datetime(2026, 5, 1, 9), datetime(2026, 5, 1, 11))
+
+    assert _book(client, users.manager, users.technician.id, "2026-05-01T10:00:00Z", "2026-05-01T10:30:00Z").status_code == 409
+
+    moved = client.put(f"/api/installations/{response.json['id']}", headers=auth(users.manager),
+                       json={"scheduled_date": "2026-05-01T08:00:00-04:00", "end_date": "2026-05-01T09:00:00-04:00"})
+    assert moved.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Installation, response.json["id"]).scheduled_date == datetime(2026, 5, 1, 12)
+
+
+def test_availability_lists_bookings_and_gaps(client, users):
+    _book(client, users.manager, users.technician.id, "2026-03-01T09:00:00Z", "2026-03-01T12:00:00Z")
+    response = client.get(f"/api/technicians/{users.technician.id}/availability"
+                          "?from=2026-03-01T08:00:00Z&to=2026-03-01T14:00:00Z", headers=auth(users.manager))
+    assert response.status_code == 200
+    assert response.json["free"] == [{"start": "2026-03-01T08:00:00", "end": "2026-03-01T09:00:00"},
+                                     {"start": "2026-03-01T12:00:00", "end": "2026-03-01T14:00:00"}]
+
+
+def test_bookings_longer_than_the_maximum_are_rejected(client, users):
+    response = _book(client, users.manager, users.technician.id, "2026-03-01T09:00:00Z", "2026-03-20T09:00:00Z")
+    assert response.status_code == 400
+    assert _book(client, users.manager, users.technician.id, "2026-03-01T09:00:00Z", "2026-03-10T09:00:00Z").status_code == 201
+    # The longest booking allowed is still found from its last day
+    assert _book(client, users.manager, users.technician.id, "2026-03-09T09:00:00Z", "2026-03-09T10:00:00Z").status_code == 409
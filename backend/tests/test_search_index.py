@@ -0,0 +1,84 @@
+# backend/tests/test_search_index.py
+import threading
+from flask import Flask
+from models import db, Customer
+import utils.search_index as search_index_module
+from utils.search_index import InvertedIndex, SearchIndexService
+
+
+def _customer_change(object_id, name):
+    return 1, object_id, {"id": object_id, "name": name, "email": None, "phone": None}, [name, None, None]
+
+
+def _names(service, q):
+    return [hit["name"] for hit in service.search(q)["customers"]]
+
+
+def test_commits_during_rebuild_are_in_the_swapped_index(monkeypatch):
+    service = SearchIndexService()
+    service.index = InvertedIndex()
+    db.session.add(Customer(name="Ada Lovelace", email="ada@example.com", status="lead"))
+    db.session.commit()
+
+    real_load, real_apply = InvertedIndex.load_from_db, search_index_module._apply
+    late = []
+
+    def load_with_concurrent_commit(index):
+        real_load(index)
+        service.apply([_customer_change(99, "Grace Hopper")])   # committed after the build read its rows
+
+    def apply_with_concurrent_commit(index, change):
+        # Another request commits while the build is being replayed and swapped in
+        if index is not service.index and not late:
+            late.append(threading.Thread(target=service.apply, args=([_customer_change(100, "Mary Jackson")],)))
+            late[0].start()
+            late[0].join(0.2)
+        real_apply(index, change)
+
+    monkeypatch.setattr(InvertedIndex, "load_from_db", load_with_concurrent_commit)
+    monkeypatch.setattr(search_index_module, "_apply", apply_with_concurrent_commit)
+    service.rebuild()
+    late[0].join()
+
+    assert _names(service, "grace") == ["Grace Hopper"]
+    assert _names(service, "mary") == ["Mary Jackson"]
+    assert _names(service, "ada") == ["Ada Lovelace"]
+
+
+def test_failed_rebuild_keeps_the_live_index(monkeypatch):
+    service = SearchIndexService()
+    service.index = InvertedIndex()
+    service.apply([_customer_change(1, "Ada Lovelace")])
+
+    def broken(index):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(InvertedIndex, "load_from_db", broken)
+    try:
+        service.rebuild()
+    except RuntimeError:
+        pass
+    service.apply([_customer_change(2, "Grace Hopper")])
+
+    assert not service._building and service._replay == []
+    assert _names(service, "a") == ["Ada Lovelace", "Grace Hopper"]
+
+
+def test_index_is_loaded_by_the_first_request_not_by_init_app(tmp_path, monkeypatch):
+    app = Flask(__name__)
+    app.config.update(SEARCH_BACKEND="memory", SEARCH_INDEX_SNAPSHOT=str(tmp_path / "index.json"))
+    service = SearchIndexService()
+    started = []
+    monkeypatch.setattr(service, "_run", lambda: started.append(True))
+
+    service.init_app(app)
+    assert service._thread is None and not service.ready
+
+    InvertedIndex().save(app.config["SEARCH_INDEX_SNAPSHOT"])
+    app.route("/ping")(lambda: "pong")
+    client = app.test_client()
+    client.get("/ping")
+    client.get("/ping")
+    service._thread.join(1)
+
+    assert service.ready and started == [True]
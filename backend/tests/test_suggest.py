@@ -0,0 +1,70 @@
+# backend/tests/test_suggest.py
+from models import db, Customer, Installation
+from utils.suggest import PrefixIndex, _keys, _suggestion_keys, suggest_service
+
+
+def _customer(name, email):
+    customer = Customer(name=name, email=email, status="lead")
+    db.session.add(customer)
+    db.session.commit()
+    return customer
+
+
+def _labels(q, limit=8):
+    return [s["label"] for s in suggest_service.suggest(q, limit)]
+
+
+def test_email_domains_are_not_keys():
+    assert _keys("john.smith@example.com") == ["john.smith@example.com", "smith@example.com"]
+    assert not [k for k in _keys("ann@mail.example.com") if k.startswith(("com", "example", "mail"))]
+
+
+def test_domain_prefix_does_not_match_every_user(users):
+    _customer("Connor Reyes", "connor@example.com")
+    assert _labels("co") == ["Connor Reyes"]
+
+
+def test_best_match_survives_truncation():
+    values = [{"type": "customer", "id": i, "label": f"Carl Customer {i:04d}", "detail": None} for i in range(500)]
+    values.append({"type": "package", "id": None, "label": "Core", "detail": None})
+    index = PrefixIndex([(key, value) for value in values for key in _suggestion_keys(value)])
+
+    best, complete = index.matches("c", 200)
+    assert best[0]["label"] == "Core" and len(best) == 200 and not complete
+    assert index.matches("core", 200) == ([values[-1]], True)
+
+
+def _rebuilds():
+    index = suggest_service._ensure_index()
+    return lambda: suggest_service._ensure_index() is not index
+
+
+def test_unindexed_writes_keep_the_index(users):
+    customer = _customer("Ada Lovelace", "ada@example.com")
+    installation = Installation(customer_id=customer.id, customer_name=customer.name,
+                                package_type="Core", status="Scheduled")
+    db.session.add(installation)
+    db.session.commit()
+
+    rebuilt = _rebuilds()
+    installation.status = "Completed"
+    customer.phone = "555-0100"
+    db.session.add(Installation(customer_id=customer.id, customer_name=customer.name,
+                                package_type="Core", status="Scheduled"))
+    db.session.commit()
+    assert not rebuilt()
+
+
+def test_indexed_writes_rebuild_the_index(users):
+    customer = _customer("Ada Lovelace", "ada@example.com")
+
+    rebuilt = _rebuilds()
+    customer.name = "Ada King"
+    db.session.commit()
+    assert rebuilt() and _labels("king") == ["Ada King"]
+
+    rebuilt = _rebuilds()
+    db.session.add(Installation(customer_id=customer.id, customer_name=customer.name,
+                                package_type="Premium", status="Scheduled"))
+    db.session.commit()
+    assert rebuilt() and _labels("prem") == ["Premium"]
@@ -0,0 +1,64 @@
+# backend/tests/test_token_revocation.py
+import time
+from models import db, TokenRevocation
+from utils.jwt_utils import TokenCache, decode_token, generate_tokens, revoke_user_tokens, token_cache
+from tests.conftest import auth
+from config import Config
+
+
+def _other_worker_revokes(**values):
+    """A revocation recorded by another process: only the shared table changes, not our cache."""
+    now = time.time()
+    db.session.add(TokenRevocation(revoked_at=now, expires_at=now + 3600, **values))
+    db.session.commit()
+
+
+def test_logout_in_another_worker_rejects_the_cached_token(client, users, monkeypatch):
+    monkeypatch.setattr(token_cache, "sync_interval", 0)
+    token = generate_tokens(users.manager.id, "manager", "mgr")[0]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/notifications/unread_count", headers=headers).status_code == 200
+
+    _other_worker_revokes(token_key=TokenCache.key(token).hex())
+
+    assert client.get("/api/notifications/unread_count", headers=headers).status_code == 401
+    assert client.get("/api/notifications/unread_count", headers=auth(users.manager)).status_code == 200
+
+
+def test_user_revocation_in_another_worker_rejects_older_tokens(client, users, monkeypatch):
+    monkeypatch.setattr(token_cache, "sync_interval", 0)
+    old = {"Authorization": "Bearer " + generate_tokens(users.technician.id, "technician", "tech")[0]}
+    assert client.get("/api/notifications/unread_count", headers=old).status_code == 200
+
+    _other_worker_revokes(user_id=users.technician.id)
+
+    assert client.get("/api/notifications/unread_count", headers=old).status_code == 401
+    time.sleep(0.01)
+    assert client.get("/api/notifications/unread_count", headers=auth(users.technician)).status_code == 200
+
+
+def test_revocations_are_picked_up_after_the_sync_interval(users, app):
+    token = generate_tokens(users.finance.id, "finance", "fin")[0]
+    assert decode_token(token, Config.JWT_SECRET)   # syncs now
+
+    _other_worker_revokes(token_key=TokenCache.key(token).hex())
+    assert decode_token(token, Config.JWT_SECRET)   # within the interval: not seen yet
+
+    token_cache._synced_at -= token_cache.sync_interval
+    assert decode_token(token, Config.JWT_SECRET) is None
+
+
+def test_logout_and_user_revocation_are_recorded_for_other_workers(client, users):
+    access, refresh = generate_tokens(users.manager.id, "manager", "mgr")
+    client.post("/api/logout", headers={"Authorization": f"Bearer {access}"}, json={"refresh_token": refresh})
+    revoke_user_tokens(users.technician.id)
+
+    rows = TokenRevocation.query.order_by(TokenRevocation.id).all()
+    assert [row.token_key for row in rows[:2]] == [TokenCache.key(access).hex(), TokenCache.key(refresh).hex()]
+    assert rows[2].user_id == users.technician.id
+
+    # Expired rows are pruned on the next write
+    TokenRevocation.query.update({"expires_at": time.time() - 1})
+    db.session.commit()
+    revoke_user_tokens(users.manager.id)
+    assert [row.user_id for row in TokenRevocation.query] == [users.manager.id]
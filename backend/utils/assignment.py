@@ -0,0 +1,299 @@
+# backend/utils/assignment.py
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, event, or_
+from models import db, AssignmentProposal, Installation, User
+from utils.notification_outbox import enqueue_notification
+from utils.schedule import ScheduleError, booking_end, bookings_between, ensure_available
+from config import Config
+
+assignment_cli = AppGroup("assignments")
+
+
+class AssignmentError(Exception):
+    def __init__(self, message, status=400, conflicts=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.conflicts = conflicts or []
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+class TechnicianCalendar:
+    """
+    One technician's bookings as parallel start-sorted lists, plus the running
+    maximum of their ends. Existing bookings may overlap each other, so a slot
+    is free iff every booking starting before its end has finished by its
+    start, i.e. the running max end at that point: one bisect.
+    """
+
+    def __init__(self, technician_id, username, intervals=()):
+        self.technician_id = technician_id
+        self.username = username
+        self.starts, self.ends, self.max_ends = [], [], []
+        self.load = timedelta()
+        for start, end in sorted(intervals):
+            self.book(start, end)
+
+    def is_free(self, start, end):
+        i = bisect_left(self.starts, end)
+        return i == 0 or self.max_ends[i - 1] <= start
+
+    def book(self, start, end):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.max_ends.insert(i, end)
+        for j in range(i, len(self.ends)):
+            self.max_ends[j] = max(self.ends[j], self.max_ends[j - 1]) if j else self.ends[j]
+        self.load += end - start
+
+
+def unassigned_jobs(window_start, window_end):
+    """Open installations scheduled in the window with no technician, in start order."""
+    return db.session.query(
+        Installation.id, Installation.scheduled_date, Installation.end_date,
+        Installation.customer_name, Installation.package_type,
+    ).filter(
+        Installation.technician_id.is_(None),
+        Installation.status != "Completed",
+        Installation.scheduled_date >= window_start,
+        Installation.scheduled_date < window_end,
+    ).order_by(Installation.scheduled_date, Installation.id).all()
+
+
+def compute_assignments(window_start, window_end):
+    """
+    Greedy interval assignment: jobs in start order, each to the free
+    technician with the least booked time so far (existing bookings plus this
+    proposal), ties by id. Returns (assignments, unassigned installation ids).
+    """
+    jobs = unassigned_jobs(window_start, window_end)
+    if not jobs:
+        return [], []
+    horizon = max(booking_end(job.scheduled_date, job.end_date) for job in jobs)
+
+    calendars = []
+    for tech_id, username in db.session.query(User.id, User.username) \
+            .filter(User.role == "technician").order_by(User.id):
+        intervals = [(row.scheduled_date, booking_end(row.scheduled_date, row.end_date))
+                     for row in bookings_between(tech_id, window_start, horizon)]
+        calendars.append(TechnicianCalendar(tech_id, username, intervals))
+
+    assignments, unassigned = [], []
+    for job in jobs:
+        start, end = job.scheduled_date, booking_end(job.scheduled_date, job.end_date)
+        free = [calendar for calendar in calendars if calendar.is_free(start, end)]
+        if not free:
+            unassigned.append(job.id)
+            continue
+        best = min(free, key=lambda calendar: (calendar.load, calendar.technician_id))
+        best.book(start, end)
+        assignments.append({
+            "installation_id": job.id,
+            "technician_id": best.technician_id,
+            "technician_name": best.username,
+            "customer_name": job.customer_name,
+            "package_type": job.package_type,
+            "scheduled_date": _iso(job.scheduled_date),
+            "end_date": _iso(job.end_date),
+        })
+    return assignments, unassigned
+
+
+def request_proposal(window_start, window_end, created_by=None):
+    """Queue a proposal in the current transaction (no commit); the worker picks it up after commit."""
+    proposal = AssignmentProposal(window_start=window_start, window_end=window_end, created_by=created_by)
+    db.session.add(proposal)
+    db.session.info["assignment_pending"] = True
+    return proposal
+
+
+def serialize_proposal(proposal):
+    return {
+        "id": proposal.id,
+        "status": proposal.status,
+        "window_start": _iso(proposal.window_start),
+        "window_end": _iso(proposal.window_end),
+        "assignments": json.loads(proposal.assignments) if proposal.assignments else [],
+        "unassigned": json.loads(proposal.unassigned) if proposal.unassigned else [],
+        "error": proposal.error,
+        "created_at": _iso(proposal.created_at),
+        "completed_at": _iso(proposal.completed_at),
+        "applied_at": _iso(proposal.applied_at),
+    }
+
+
+def _claim_next():
+    """
+    Atomically move the oldest pending proposal (or one whose worker died
+    mid-run) to running; returns it, or None when there is nothing to do.
+    """
+    now = datetime.utcnow()
+    abandoned = now - timedelta(seconds=Config.ASSIGNMENT_STALE_AFTER)
+    while True:
+        proposal = AssignmentProposal.query.filter(or_(
+            AssignmentProposal.status == "pending",
+            and_(AssignmentProposal.status == "running", AssignmentProposal.started_at < abandoned),
+        )).order_by(AssignmentProposal.id).first()
+        if proposal is None:
+            return None
+        claimed = AssignmentProposal.query \
+            .filter_by(id=proposal.id, status=proposal.status, started_at=proposal.started_at) \
+            .update({"status": "running", "started_at": now}, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            return db.session.get(AssignmentProposal, proposal.id)
+        # another worker got it
+
+
+def process_proposals():
+    """Compute every queued proposal; returns the number processed."""
+    processed = 0
+    while True:
+        proposal = _claim_next()
+        if proposal is None:
+            return processed
+        proposal_id = proposal.id
+        try:
+            assignments, unassigned = compute_assignments(proposal.window_start, proposal.window_end)
+            proposal.assignments = json.dumps(assignments)
+            proposal.unassigned = json.dumps(unassigned)
+            proposal.status = "ready"
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Assignment proposal #%s failed", proposal_id)
+            proposal = db.session.get(AssignmentProposal, proposal_id)
+            proposal.status = "failed"
+            proposal.error = str(e)[:255]
+        proposal.completed_at = datetime.utcnow()
+        db.session.commit()
+        processed += 1
+
+
+def apply_proposal(proposal_id):
+    """
+    Assign every installation in a ready proposal in one transaction, with
+    the same double-booking check as a manual assignment. If any installation
+    changed since the proposal was computed, nothing is applied and the
+    proposal is marked stale.
+    """
+    proposal = db.session.query(AssignmentProposal).filter_by(id=proposal_id).with_for_update().first()
+    if proposal is None:
+        raise AssignmentError("Proposal not found", 404)
+    if proposal.status != "ready":
+        raise AssignmentError(f"Proposal is {proposal.status}", 409)
+
+    entries = json.loads(proposal.assignments or "[]")
+    technicians = {tech_id for (tech_id,) in db.session.query(User.id).filter(User.role == "technician")}
+    conflicts = []
+    for entry in entries:
+        installation = db.session.get(Installation, entry["installation_id"])
+        if installation is None or installation.technician_id is not None \
+                or _iso(installation.scheduled_date) != entry["scheduled_date"] \
+                or _iso(installation.end_date) != entry["end_date"]:
+            conflicts.append({"installation_id": entry["installation_id"], "reason": "Changed since the proposal"})
+            continue
+        if entry["technician_id"] not in technicians:
+            conflicts.append({"installation_id": installation.id, "reason": "Technician no longer available"})
+            continue
+        try:
+            ensure_available(entry["technician_id"], installation.scheduled_date, installation.end_date,
+                             exclude_id=installation.id)
+        except ScheduleError as e:
+            conflicts.append({"installation_id": installation.id, "reason": e.message})
+            continue
+        installation.technician_id = entry["technician_id"]
+        enqueue_notification(f"You have been assigned Installation #{installation.id}",
+                             user_ids=[installation.technician_id],
+                             object_type="installation", object_id=installation.id)
+
+    if conflicts:
+        db.session.rollback()
+        AssignmentProposal.query.filter_by(id=proposal_id, status="ready") \
+            .update({"status": "stale"}, synchronize_session=False)
+        db.session.commit()
+        raise AssignmentError("Proposal is out of date; request a new one", 409, conflicts)
+
+    proposal.status = "applied"
+    proposal.applied_at = datetime.utcnow()
+    db.session.commit()
+    return len(entries)
+
+
+@event.listens_for(db.session, "after_commit")
+def _wake_worker_after_commit(session):
+    if session.info.pop("assignment_pending", False):
+        assignment_worker.wake()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("assignment_pending", None)
+
+
+class AssignmentWorker:
+    """Background thread that computes queued proposals when woken after a commit, and on a timer."""
+
+    def __init__(self):
+        self.app = None
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        if app.config["ASSIGNMENT_WORKER"]:
+            # Started by the first request, so CLI commands (db upgrade,
+            # `assignments process --loop`) never compute proposals in the background too
+            app.before_request(self._start)
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="assignment-worker", daemon=True)
+                    self._thread.start()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        interval = self.app.config["ASSIGNMENT_INTERVAL"]
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    process_proposals()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Assignment worker failed; will retry")
+                finally:
+                    db.session.remove()
+
+
+assignment_worker = AssignmentWorker()
+
+
+@assignment_cli.command("process")
+@click.option("--loop", is_flag=True, help="Keep processing (run as a separate worker process).")
+@click.option("--interval", default=5.0, help="Seconds between polls with --loop.")
+def process_command(loop, interval):
+    """Compute queued auto-assignment proposals."""
+    while True:
+        processed = process_proposals()
+        if processed or not loop:
+            click.echo(f"Computed {processed} proposal(s).")
+        if not loop:
+            return
+        time.sleep(interval)
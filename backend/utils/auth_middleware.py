@@ -1,12 +1,108 @@
 # backend/utils/auth_middleware.py
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, g, current_app
 from utils.jwt_utils import decode_token
-from models import User
+from utils.principal_cache import principal_cache, Principal
+from models import db, User
 from config import Config
 
 PUBLIC_ROUTES = ["/api/login", "/api/refresh"]
 
+
+def roles_allowed(*roles):
+    """
+    Declare which roles may call a view.
+    Place it *below* @token_required / @role_required; the roles are compiled
+    into the app's policy table by compile_role_policies() at startup.
+    Usage: @roles_allowed("admin", "manager")
+    """
+    def wrapper(fn):
+        fn.allowed_roles = frozenset(roles)
+        return fn
+    return wrapper
+
+
+def accepts_query_token(fn):
+    """
+    Also accept the access token as ?access_token=... (for EventSource,
+    which cannot send an Authorization header). Place below @token_required.
+    """
+    fn.accepts_query_token = True
+    return fn
+
+
+def compile_role_policies(app):
+    """
+    Build {endpoint: frozenset(roles)} once all blueprints are registered,
+    so each request's role check is a dict lookup plus one set-membership test.
+    """
+    policies = {}
+    query_token_endpoints = set()
+    for endpoint, view in app.view_functions.items():
+        roles = getattr(view, "allowed_roles", None)
+        if roles is not None:
+            policies[endpoint] = roles
+        if getattr(view, "accepts_query_token", False):
+            query_token_endpoints.add(endpoint)
+    app.extensions["role_policies"] = policies
+    app.extensions["query_token_endpoints"] = frozenset(query_token_endpoints)
+    return policies
+
+
+def authenticate():
+    """
+    Decode the bearer token and resolve the principal at most once per request.
+    Returns (principal, None) or (None, (message, status)); memoized on flask.g.
+    """
+    if "auth_result" not in g:
+        g.auth_result = _authenticate()
+    return g.auth_result
+
+
+def _authenticate():
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+    elif request.endpoint in current_app.extensions.get("query_token_endpoints", ()) \
+            and request.args.get("access_token"):
+        token = request.args["access_token"]
+    else:
+        return None, ("Token is missing or invalid", 401)
+
+    user_data = decode_token(token, Config.JWT_SECRET)
+
+    if not user_data:
+        return None, ("Access token is invalid or expired", 401)
+    g.auth_claims = user_data
+
+    # Prevent refresh tokens from being used in Authorization header
+    exp_seconds = user_data.get("exp")
+    if not exp_seconds:
+        return None, ("Invalid token structure", 401)
+
+    user = resolve_principal(user_data)
+    if not user:
+        return None, ("User not found", 404)
+
+    return user, None
+
+
+def is_authorized(principal, required=None):
+    """
+    Check the principal's role against the compiled policy for this endpoint,
+    falling back to the view's own @roles_allowed for views registered after
+    compile_role_policies() (or apps that never call it), then to `required`.
+    A view that declared roles somewhere is never left open.
+    """
+    allowed = current_app.extensions.get("role_policies", {}).get(request.endpoint)
+    if allowed is None:
+        view = current_app.view_functions.get(request.endpoint)
+        allowed = getattr(view, "allowed_roles", None)
+    if allowed is None:
+        allowed = required
+    return allowed is None or principal.role in allowed
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -17,25 +113,13 @@ def token_required(f):
         if request.method == "OPTIONS":  # CORS preflight
             return '', 200
 
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return jsonify({"message": "Token is missing or invalid"}), 401
-
-        token = auth_header.split(" ")[1]
-        user_data = decode_token(token, Config.JWT_SECRET)
-
-        if not user_data:
-            return jsonify({"message": "Access token is invalid or expired"}), 401
-
-        # Prevent refresh tokens from being used in Authorization header
-        exp_seconds = user_data.get("exp")
-        if not exp_seconds:
-            return jsonify({"message": "Invalid token structure"}), 401
+        user, error = authenticate()
+        if error:
+            message, status = error
+            return jsonify({"message": message}), status
 
-        # Load user from DB
-        user = User.query.get(user_data["user_id"])
-        if not user:
-            return jsonify({"message": "User not found"}), 404
+        if not is_authorized(user):
+            return jsonify({"message": "Access forbidden"}), 403
 
         # Attach user to request context
         request.user = user
@@ -43,3 +127,26 @@ def token_required(f):
         return f(user, *args, **kwargs)
 
     return decorated
+
+
+def resolve_principal(user_data):
+    """
+    Map verified token claims to a Principal.
+    Trusts the claims outright when AUTH_TRUST_TOKEN_CLAIMS is set,
+    otherwise goes through the principal cache and only hits the DB on a miss.
+    """
+    if Config.AUTH_TRUST_TOKEN_CLAIMS:
+        return principal_cache.from_claims(user_data)
+
+    user_id = user_data["user_id"]
+    principal = principal_cache.get(user_id)
+    if principal:
+        return principal
+
+    row = db.session.query(User.id, User.username, User.role).filter(User.id == user_id).first()
+    if not row:
+        return None
+
+    principal = Principal(row.id, row.username, row.role)
+    principal_cache.put(principal)
+    return principal
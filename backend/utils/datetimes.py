@@ -0,0 +1,32 @@
+# backend/utils/datetimes.py
+from datetime import datetime, timezone
+
+
+def parse_iso_datetime(dt_str):
+    """Safely parse ISO 8601 datetime, handle 'Z' (UTC) suffix."""
+    if not dt_str:
+        return None
+    try:
+        if dt_str.endswith("Z"):
+            dt_str = dt_str.replace("Z", "+00:00")
+        return datetime.fromisoformat(dt_str)
+    except Exception:
+        return None
+
+
+def naive_utc(value):
+    """Datetimes are stored naive (UTC); normalise aware request values to match."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_filter_datetime(value):
+    """
+    A ?date_from= / ?date_to= value as naive UTC, so "...Z" / "+02:00" filters
+    compare correctly with stored datetimes. Raises ValueError if malformed.
+    """
+    parsed = naive_utc(parse_iso_datetime(value))
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
@@ -0,0 +1,226 @@
+# backend/utils/finance_metrics.py
+from collections import defaultdict
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, insert, inspect, update
+from models import db, FinanceRollup, Installation, Invoice, User
+from utils.notifications import dialect_insert
+from utils.time_buckets import fill_months
+
+finance_cli = AppGroup("finance")
+
+# Setting any of these loads the previous value first, so the flush hook
+# below always sees the real before/after even on expired instances.
+_TRACKED = [
+    Invoice.status, Invoice.amount, Invoice.created_at, Invoice.installation_id,
+    Installation.status, Installation.package_type, Installation.technician_id,
+]
+for _attribute in _TRACKED:
+    event.listen(_attribute, "set", lambda target, value, oldvalue, initiator: None, active_history=True)
+
+
+def invoice_contribution(status, amount, created_at, package_type, technician_id):
+    """Rollup rows one invoice counts towards: [(dimension, key, count, amount), ...]."""
+    amount = amount or 0
+    rows = [("invoice_status", status or "pending", 1, amount)]
+    if status == "paid":
+        if created_at:
+            rows.append(("month", created_at.strftime("%Y-%m"), 1, amount))
+        if package_type:
+            rows.append(("package", package_type, 1, amount))
+        if technician_id:
+            rows.append(("technician", str(technician_id), 1, amount))
+    return rows
+
+
+def installation_contribution(status):
+    return [("installation_status", status, 1, 0)] if status else []
+
+
+def _previous(obj, name):
+    history = inspect(obj).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, name)
+
+
+def _installation_fields(installation_id, previous=False):
+    installation = db.session.get(Installation, installation_id) if installation_id else None
+    if installation is None:
+        return None, None
+    if previous:
+        return _previous(installation, "package_type"), _previous(installation, "technician_id")
+    return installation.package_type, installation.technician_id
+
+
+def _invoice_state(invoice, previous=False):
+    value = (lambda name: _previous(invoice, name)) if previous else (lambda name: getattr(invoice, name))
+    package_type, technician_id = _installation_fields(value("installation_id"), previous)
+    return invoice_contribution(value("status"), value("amount"), value("created_at"), package_type, technician_id)
+
+
+def collect_deltas(session):
+    """{(dimension, key): [count, amount]} for everything pending in this flush."""
+    deltas = defaultdict(lambda: [0, 0.0])
+
+    def add(rows, sign):
+        for dimension, key, count, amount in rows:
+            delta = deltas[(dimension, key)]
+            delta[0] += sign * count
+            delta[1] += sign * amount
+
+    touched_invoices = set()
+    for invoice in session.new:
+        if isinstance(invoice, Invoice):
+            if invoice.created_at is None:
+                invoice.created_at = datetime.utcnow()  # month is needed before the server default exists
+            add(_invoice_state(invoice), 1)
+            touched_invoices.add(invoice.installation_id)
+    for invoice in session.deleted:
+        if isinstance(invoice, Invoice):
+            add(_invoice_state(invoice, previous=True), -1)
+            touched_invoices.add(_previous(invoice, "installation_id"))
+    for invoice in session.dirty:
+        if isinstance(invoice, Invoice) and session.is_modified(invoice):
+            add(_invoice_state(invoice, previous=True), -1)
+            add(_invoice_state(invoice), 1)
+            touched_invoices.update({invoice.installation_id, _previous(invoice, "installation_id")})
+
+    for installation in session.new:
+        if isinstance(installation, Installation):
+            add(installation_contribution(installation.status), 1)
+    for installation in session.deleted:
+        if isinstance(installation, Installation):
+            add(installation_contribution(_previous(installation, "status")), -1)
+    for installation in session.dirty:
+        if not isinstance(installation, Installation) or not session.is_modified(installation):
+            continue
+        add(installation_contribution(_previous(installation, "status")), -1)
+        add(installation_contribution(installation.status), 1)
+
+        # A paid invoice moves with its installation's package / technician
+        if installation.id in touched_invoices:
+            continue
+        invoice = db.session.query(Invoice).filter_by(installation_id=installation.id).first()
+        if invoice is not None and invoice.status == "paid":
+            args = (invoice.status, invoice.amount, invoice.created_at)
+            add(invoice_contribution(*args, _previous(installation, "package_type"),
+                                     _previous(installation, "technician_id")), -1)
+            add(invoice_contribution(*args, installation.package_type, installation.technician_id), 1)
+
+    return {key: delta for key, delta in deltas.items() if delta[0] or abs(delta[1]) > 1e-9}
+
+
+def apply_deltas(session, deltas):
+    """
+    Atomic `count = count + delta` per rollup row. Rows seen for the first time
+    are upserted (ON CONFLICT DO UPDATE), so two transactions creating the same
+    row both land instead of one failing its flush on the primary key.
+    """
+    upsert = dialect_insert()
+    if upsert is None:
+        for (dimension, key), (count, amount) in deltas.items():
+            updated = session.execute(
+                update(FinanceRollup)
+                .where(FinanceRollup.dimension == dimension, FinanceRollup.key == key)
+                .values(count=FinanceRollup.count + count, amount=FinanceRollup.amount + amount)
+            ).rowcount
+            if not updated:
+                session.execute(insert(FinanceRollup).values(dimension=dimension, key=key, count=count, amount=amount))
+        return
+
+    table = FinanceRollup.__table__
+    for (dimension, key), (count, amount) in deltas.items():
+        statement = upsert(table).values(dimension=dimension, key=key, count=count, amount=amount)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.dimension, table.c.key],
+            set_={"count": table.c.count + count, "amount": table.c.amount + amount},
+        ))
+
+
+@event.listens_for(db.session, "before_flush")
+def _maintain_rollups(session, flush_context, instances):
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session, deltas)
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from invoices and installations, in one transaction."""
+    totals = defaultdict(lambda: [0, 0.0])
+
+    def add(rows):
+        for dimension, key, count, amount in rows:
+            totals[(dimension, key)][0] += count
+            totals[(dimension, key)][1] += amount
+
+    invoices = db.session.query(
+        Invoice.status, Invoice.amount, Invoice.created_at,
+        Installation.package_type, Installation.technician_id,
+    ).outerjoin(Installation, Invoice.installation_id == Installation.id)
+    for row in invoices.yield_per(1000):
+        add(invoice_contribution(*row))
+
+    for status, count in db.session.query(Installation.status, db.func.count()).group_by(Installation.status):
+        totals[("installation_status", status)][0] += count
+
+    db.session.query(FinanceRollup).delete(synchronize_session=False)
+    if totals:
+        db.session.execute(insert(FinanceRollup), [
+            {"dimension": dimension, "key": key, "count": count, "amount": amount}
+            for (dimension, key), (count, amount) in totals.items()
+        ])
+    db.session.commit()
+    return len(totals)
+
+
+def load_rollups(*dimensions):
+    """{dimension: {key: (count, amount)}} -- a primary-key range read per dimension."""
+    result = {dimension: {} for dimension in dimensions}
+    rows = db.session.query(FinanceRollup.dimension, FinanceRollup.key, FinanceRollup.count, FinanceRollup.amount) \
+        .filter(FinanceRollup.dimension.in_(dimensions))
+    for dimension, key, count, amount in rows:
+        if count:
+            result[dimension][key] = (count, amount)
+    return result
+
+
+def finance_summary_metrics():
+    rollups = load_rollups("invoice_status", "installation_status", "month")
+    paid_count, paid_amount = rollups["invoice_status"].get("paid", (0, 0.0))
+    installations = rollups["installation_status"]
+
+    return {
+        "total_revenue": float(paid_amount),
+        "jobs_completed": installations.get("Completed", (0, 0))[0],
+        "outstanding_jobs": sum(installations.get(s, (0, 0))[0] for s in ("Scheduled", "In Progress")),
+        "average_price": round(paid_amount / paid_count, 2) if paid_count else 0.0,
+        "monthly_revenue": fill_months({month: amount for month, (_, amount) in rollups["month"].items()}),
+    }
+
+
+def finance_breakdown_metrics():
+    rollups = load_rollups("package", "technician")
+    technician_ids = [int(key) for key in rollups["technician"]]
+    names = dict(db.session.query(User.id, User.username).filter(User.id.in_(technician_ids))) \
+        if technician_ids else {}
+
+    return {
+        "packages": [
+            {"package_type": package, "revenue": float(amount)}
+            for package, (_, amount) in sorted(rollups["package"].items())
+        ],
+        "technicians": [
+            {"technician_name": names[int(key)], "revenue": float(amount)}
+            for key, (_, amount) in sorted(rollups["technician"].items(), key=lambda item: int(item[0]))
+            if int(key) in names
+        ],
+    }
+
+
+@finance_cli.command("rebuild-metrics")
+def rebuild_metrics_command():
+    """Recompute the finance rollup table from invoices and installations."""
+    rows = rebuild_rollups()
+    click.echo(f"Rebuilt {rows} finance rollup row(s).")
@@ -0,0 +1,151 @@
+# backend/utils/invoices.py
+from datetime import timedelta
+from werkzeug.http import http_date
+from models import db, Invoice, Installation, Customer
+from utils.datetimes import parse_filter_datetime
+from utils.projections import Projection
+
+INVOICE_STATUSES = ("pending", "paid", "overdue")
+INVOICE_ORDER = [(Invoice.id, True)]  # newest first
+
+_LISTING_JOINS = [
+    (Installation, Invoice.installation_id == Installation.id),
+    (Customer, Installation.customer_id == Customer.id),
+]
+
+# Admin / finance: the full listing
+INVOICE_LIST = Projection(Invoice, [
+    ("id", Invoice.id),
+    ("amount", Invoice.amount),
+    ("status", Invoice.status),
+    ("installation_id", Invoice.installation_id),
+    ("created_at", Invoice.created_at),
+    ("installation_pk", Installation.id),
+    ("package_type", Installation.package_type),
+    ("customer_name", Customer.name),
+], joins=_LISTING_JOINS)
+
+# Managers track billing status of jobs, not amounts
+INVOICE_STATUS_LIST = Projection(Invoice, [
+    ("id", Invoice.id),
+    ("status", Invoice.status),
+    ("installation_id", Invoice.installation_id),
+    ("created_at", Invoice.created_at),
+    ("installation_pk", Installation.id),
+    ("package_type", Installation.package_type),
+    ("customer_name", Customer.name),
+], joins=_LISTING_JOINS)
+
+ROLE_PROJECTIONS = {
+    "admin": INVOICE_LIST,
+    "finance": INVOICE_LIST,
+    "manager": INVOICE_STATUS_LIST,
+}
+
+
+class InvoiceError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def serialize_invoice_row(row):
+    item = {
+        "id": row.id,
+        "status": row.status,
+        "installation_id": row.installation_id,
+        "created_at": http_date(row.created_at) if row.created_at else None,
+        "installation": {
+            "id": row.installation_pk,
+            "package_type": row.package_type,
+            "customer_name": row.customer_name,
+        }
+    }
+    if "amount" in row._fields:
+        item["amount"] = row.amount
+    return item
+
+
+def apply_invoice_filters(query, args):
+    """
+    ?status=, ?customer_id=, ?date_from= / ?date_to= (ISO dates or datetimes, inclusive
+    range on created_at; a bare date_to covers that whole day). Raises ValueError on a
+    malformed value.
+    """
+    if args.get("status"):
+        query = query.where(Invoice.status == args["status"])
+    if args.get("customer_id"):
+        query = query.where(Invoice.customer_id == int(args["customer_id"]))
+    if args.get("date_from"):
+        query = query.where(Invoice.created_at >= parse_filter_datetime(args["date_from"]))
+    if args.get("date_to"):
+        query = query.where(date_to_condition(Invoice.created_at, args["date_to"]))
+    return query
+
+
+def date_to_condition(column, value):
+    """column <= value for a datetime; column < the next midnight for a bare YYYY-MM-DD."""
+    parsed = parse_filter_datetime(value)
+    if len(value) == 10:
+        return column < parsed + timedelta(days=1)
+    return column <= parsed
+
+
+def invoice_listing(role, args):
+    """
+    The one listing query for every invoice view: the role's projection plus filters.
+    Raises ValueError on a malformed filter, KeyError for a role with no invoice view.
+    """
+    return apply_invoice_filters(ROLE_PROJECTIONS[role].statement, args)
+
+
+def create_invoice(installation_id, amount, owner_id=None):
+    installation = db.session.get(Installation, installation_id) if installation_id else None
+    if not installation:
+        raise InvoiceError("Installation not found", 404)
+    if installation.status != "Completed":
+        raise InvoiceError("Installation must be completed before invoicing")
+    if amount is None:
+        raise InvoiceError("Amount is required")
+    if db.session.query(Invoice.id).filter_by(installation_id=installation_id).first():
+        raise InvoiceError("Invoice already exists for this installation")
+
+    invoice = Invoice(
+        amount=amount,
+        status="pending",
+        owner_id=owner_id,
+        installation_id=installation_id,
+        customer_id=installation.customer_id,
+    )
+    db.session.add(invoice)
+    db.session.commit()
+    return invoice
+
+
+def update_invoice(invoice_id, data):
+    """Apply status / amount changes; the invoice table's only editable fields."""
+    invoice = db.session.get(Invoice, invoice_id)
+    if not invoice:
+        raise InvoiceError("Invoice not found", 404)
+
+    status = data.get("status", invoice.status)
+    if status not in INVOICE_STATUSES:
+        raise InvoiceError(f"Status must be one of: {', '.join(INVOICE_STATUSES)}")
+    invoice.status = status
+    if data.get("amount") is not None:
+        try:
+            invoice.amount = float(data["amount"])
+        except (TypeError, ValueError):
+            raise InvoiceError("Amount must be a number")
+
+    db.session.commit()
+    return invoice
+
+
+def delete_invoice(invoice_id):
+    invoice = db.session.get(Invoice, invoice_id)
+    if not invoice:
+        raise InvoiceError("Invoice not found", 404)
+    db.session.delete(invoice)
+    db.session.commit()
@@ -1,26 +1,42 @@
 # backend/utils/jwt_utils.py
 import jwt
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from flask import has_app_context
+from sqlalchemy import select
+from models import db, TokenRevocation
+from utils.principal_cache import principal_cache
 from config import Config
 
+REFRESH_TOKEN_LIFETIME = timedelta(days=7)
+SYNC_OVERLAP = 60   # seconds of revocations re-read on each sync
+
 def generate_tokens(user_id, role, username):
     """
     Returns (access_token, refresh_token)
     Access token short lived (15 min). Refresh token long lived (7 days).
     Both tokens include user_id, username, role to keep frontend decoding simple.
     """
+    now = datetime.utcnow()
+    issued_at = time.time()  # sub-second precision so revoke_user_tokens() has a sharp cut-off
+
     access_payload = {
         "user_id": user_id,
         "username": username,
         "role": role,
-        "exp": datetime.utcnow() + timedelta(minutes=15),
+        "iat": issued_at,
+        "exp": now + timedelta(minutes=15),
     }
 
     refresh_payload = {
         "user_id": user_id,
         "username": username,
         "role": role,
-        "exp": datetime.utcnow() + timedelta(days=7),
+        "iat": issued_at,
+        "exp": now + REFRESH_TOKEN_LIFETIME,
     }
 
     access_token = jwt.encode(access_payload, Config.JWT_SECRET, algorithm="HS256")
@@ -34,14 +50,193 @@ def generate_tokens(user_id, role, username):
 
     return access_token, refresh_token
 
-def decode_token(token, secret):
+
+class TokenCache:
     """
-    Return decoded payload dict or None if invalid/expired.
+    Bounded LRU of verified payloads keyed by a SHA-256 of the token.
+    Entries expire at the token's own `exp`. A revoked token (or every token a
+    user was issued before a cut-off) is rejected even if it is still
+    cryptographically valid. Revocations are recorded in token_revocations and
+    pulled from there by every worker process at least every `sync_interval`
+    seconds, so a logout in one worker reaches the others within that.
+    """
+
+    def __init__(self, maxsize=4096, sync_interval=5):
+        self.maxsize = maxsize
+        self.sync_interval = sync_interval
+        self._data = OrderedDict()      # digest -> (secret, exp, payload)
+        self._revoked_tokens = {}       # digest -> exp
+        self._revoked_users = {}        # user_id -> (revoked_at, forget_after)
+        self._synced_at = None          # monotonic time of the last sync
+        self._synced_until = 0.0        # newest revoked_at seen so far (epoch seconds)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, key, secret):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != secret:
+                self.misses += 1
+                return None
+            if entry[1] <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, secret, payload):
+        with self._lock:
+            self._data[key] = (secret, payload["exp"], payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def is_revoked(self, key, payload):
+        if not self._revoked_tokens and not self._revoked_users:
+            return False
+        with self._lock:
+            if key in self._revoked_tokens:
+                return True
+            revoked = self._revoked_users.get(payload.get("user_id"))
+            return revoked is not None and payload.get("iat", 0) <= revoked[0]
+
+    def revoke(self, key, exp):
+        with self._lock:
+            self._data.pop(key, None)
+            self._revoked_tokens[key] = exp
+            self._prune(time.time())
+
+    def revoke_user(self, user_id, revoked_at=None):
+        """Reject the user's tokens issued up to `revoked_at` (default now); returns the cut-off."""
+        now = time.time()
+        revoked_at = now if revoked_at is None else revoked_at
+        with self._lock:
+            # Any token issued up to the cut-off is dead; remember it for as
+            # long as the longest-lived token could still be presented.
+            previous = self._revoked_users.get(user_id)
+            if previous is None or previous[0] < revoked_at:
+                self._revoked_users[user_id] = (revoked_at, revoked_at + REFRESH_TOKEN_LIFETIME.total_seconds())
+            for key in [k for k, v in self._data.items() if v[2].get("user_id") == user_id]:
+                del self._data[key]
+            self._prune(now)
+        return revoked_at
+
+    def sync_due(self):
+        return self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_interval
+
+    def sync(self, fetch):
+        """
+        Apply revocations recorded by any process: `fetch(since)` returns rows
+        (token_key, user_id, revoked_at, expires_at) with revoked_at >= since.
+        Rows are re-read from SYNC_OVERLAP seconds before the newest one seen, so
+        a slow commit or a little clock skew between workers doesn't lose one.
+        Only one thread syncs at a time; the others keep the current state.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            since = self._synced_until - SYNC_OVERLAP if self._synced_until else 0.0
+            for token_key, user_id, revoked_at, expires_at in fetch(since):
+                if token_key:
+                    key = bytes.fromhex(token_key)
+                    with self._lock:
+                        self._data.pop(key, None)
+                        self._revoked_tokens[key] = expires_at
+                if user_id is not None:
+                    self.revoke_user(user_id, revoked_at)
+                    principal_cache.invalidate(user_id)   # its role or username may have changed
+                self._synced_until = max(self._synced_until, revoked_at)
+            self._synced_at = time.monotonic()
+        finally:
+            self._sync_lock.release()
+
+    def _prune(self, now):
+        for key in [k for k, exp in self._revoked_tokens.items() if exp <= now]:
+            del self._revoked_tokens[key]
+        for uid in [u for u, (_, forget) in self._revoked_users.items() if forget <= now]:
+            del self._revoked_users[uid]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset(self):
+        """Forget cached payloads and revocations; the next decode re-syncs from the database."""
+        with self._lock:
+            self._data.clear()
+            self._revoked_tokens.clear()
+            self._revoked_users.clear()
+            self._synced_at, self._synced_until = None, 0.0
+
+
+token_cache = TokenCache(maxsize=Config.JWT_DECODE_CACHE_SIZE, sync_interval=Config.JWT_REVOCATION_SYNC_SECONDS)
+
+
+def _fetch_revocations(since):
+    # Own connection: never touches (or rolls back) the request's session
+    columns = TokenRevocation.__table__.c
+    with db.engine.connect() as connection:
+        return connection.execute(
+            select(columns.token_key, columns.user_id, columns.revoked_at, columns.expires_at)
+            .where(columns.revoked_at >= since, columns.expires_at > time.time())
+            .order_by(columns.revoked_at)
+        ).all()
+
+
+def _record_revocation(**values):
+    """Store a revocation for the other workers (commits), dropping rows whose tokens have all expired."""
+    db.session.add(TokenRevocation(**values))
+    TokenRevocation.query.filter(TokenRevocation.expires_at <= time.time()).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def decode_token(token, secret, use_cache=True):
+    """
+    Return decoded payload dict or None if invalid/expired/revoked.
     Use the given secret (we call with Config.JWT_SECRET).
+    Verified payloads are cached until their `exp` unless use_cache=False.
     """
-    try:
-        return jwt.decode(token, secret, algorithms=["HS256"])
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
+    key = TokenCache.key(token)
+
+    payload = token_cache.get(key, secret) if use_cache else None
+    if payload is None:
+        try:
+            payload = jwt.decode(token, secret, algorithms=["HS256"])
+        except jwt.ExpiredSignatureError:
+            return None
+        except jwt.InvalidTokenError:
+            return None
+
+        if use_cache and "exp" in payload:
+            token_cache.put(key, secret, payload)
+
+    if has_app_context() and token_cache.sync_due():
+        token_cache.sync(_fetch_revocations)
+    if token_cache.is_revoked(key, payload):
         return None
+    return payload
+
+
+def revoke_token(token, secret):
+    """Reject this token from now on, in every worker (e.g. on logout). Commits."""
+    payload = decode_token(token, secret)
+    if payload:
+        key, exp = TokenCache.key(token), payload.get("exp", time.time())
+        token_cache.revoke(key, exp)
+        _record_revocation(token_key=key.hex(), revoked_at=time.time(), expires_at=exp)
+
+
+def revoke_user_tokens(user_id):
+    """Reject every token issued to this user so far, in every worker (e.g. user deleted or role changed). Commits."""
+    revoked_at = token_cache.revoke_user(user_id)
+    _record_revocation(user_id=user_id, revoked_at=revoked_at,
+                       expires_at=revoked_at + REFRESH_TOKEN_LIFETIME.total_seconds())
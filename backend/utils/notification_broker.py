@@ -0,0 +1,162 @@
+# backend/utils/notification_broker.py
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from config import Config
+
+
+class Subscription:
+    """One connected client: a bounded buffer that drops the oldest events when full."""
+
+    def __init__(self, user_id, maxlen):
+        self.user_id = user_id
+        self._events = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, event):
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Next event, or None on timeout."""
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+    def take_dropped(self):
+        with self._cond:
+            dropped, self.dropped = self.dropped, 0
+            return dropped
+
+
+class Broker(ABC):
+    """Interface: fan notification events out to the subscribers of a user."""
+
+    @abstractmethod
+    def publish(self, user_id, event):
+        """Deliver `event` to every subscription of `user_id`."""
+
+    @abstractmethod
+    def subscribe(self, user_id):
+        """Register and return a new Subscription for `user_id`."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Stop delivering to `subscription`."""
+
+
+class InMemoryBroker(Broker):
+    """Single-process fan-out; only reaches clients connected to this worker."""
+
+    def __init__(self, buffer_size=100):
+        self.buffer_size = buffer_size
+        self._subscribers = {}   # user_id -> set(Subscription)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        self._deliver(user_id, event)
+
+    def _deliver(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+class SpoolBroker(InMemoryBroker):
+    """
+    Local stand-in for a shared pub/sub (Redis etc.) when running several
+    gunicorn workers on one host: every publish is appended as a JSON line
+    to a shared spool file, and each worker tails that file and fans the
+    events out to its own subscribers.
+    """
+
+    def __init__(self, path, buffer_size=100, max_bytes=5 * 1024 * 1024, poll_interval=0.25):
+        super().__init__(buffer_size)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self._tailer = None
+        self._tailer_lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        line = json.dumps({"user_id": user_id, "event": event}) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size > self.max_bytes:
+                os.ftruncate(fd, 0)   # readers notice the shrink and rewind
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def subscribe(self, user_id):
+        self._ensure_tailer()
+        return super().subscribe(user_id)
+
+    def _ensure_tailer(self):
+        with self._tailer_lock:
+            if self._tailer is None:
+                self._tailer = threading.Thread(target=self._tail, name="notification-spool", daemon=True)
+                self._tailer.start()
+
+    def _tail(self):
+        # Start at the current end: history is served by /api/notifications
+        offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        while True:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                size = 0
+            if size < offset:
+                offset = 0
+            if size > offset:
+                with open(self.path, "rb") as spool:
+                    spool.seek(offset)
+                    chunk = spool.read(size - offset)
+                # Only consume complete lines; a partial write is picked up next round
+                complete = chunk.rfind(b"\n") + 1
+                offset += complete
+                for line in chunk[:complete].splitlines():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._deliver(record["user_id"], record["event"])
+            time.sleep(self.poll_interval)
+
+
+def _make_broker():
+    if Config.NOTIFICATION_BROKER == "spool":
+        return SpoolBroker(Config.NOTIFICATION_SPOOL_PATH, buffer_size=Config.NOTIFICATION_STREAM_BUFFER)
+    return InMemoryBroker(buffer_size=Config.NOTIFICATION_STREAM_BUFFER)
+
+
+broker = _make_broker()
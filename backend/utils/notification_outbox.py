@@ -0,0 +1,169 @@
+# backend/utils/notification_outbox.py
+import json
+import threading
+import time
+from datetime import datetime
+import click
+from flask import current_app
+from sqlalchemy import event
+from models import db, NotificationOutbox, User
+from utils.recipient_directory import recipient_directory
+from utils.notifications import build_notifications, save_notifications, publish_notifications, notifications_cli
+
+
+def enqueue_notification(message, roles=(), user_ids=(), object_type=None, object_id=None, extra=None):
+    """
+    Record a notification intent in the current transaction (no commit).
+    It is delivered after the caller commits, or not at all if the caller rolls back.
+    """
+    db.session.add(NotificationOutbox(
+        message=message,
+        object_type=object_type,
+        object_id=object_id,
+        extra=json.dumps(extra) if extra else None,
+        roles=",".join(roles) or None,
+        user_ids=",".join(str(uid) for uid in user_ids if uid) or None,
+    ))
+    db.session.info["outbox_pending"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def _wake_worker_after_commit(session):
+    if session.info.pop("outbox_pending", False):
+        outbox_worker.wake()
+
+
+def resolve_recipients(entry):
+    """
+    Role members plus explicit user ids, minus users that no longer exist. The
+    directory can be stale (users deleted by another worker), so every id is
+    checked against users in one query; a miss also refreshes the directory.
+    """
+    user_ids = {int(uid) for uid in entry.user_ids.split(",")} if entry.user_ids else set()
+    roles = entry.roles.split(",") if entry.roles else ()
+    candidates = recipient_directory.recipients_for(roles, user_ids)
+    if not candidates:
+        return candidates
+    existing = {uid for (uid,) in db.session.query(User.id).filter(User.id.in_(candidates))}
+    if (candidates - existing) - user_ids:
+        recipient_directory.invalidate()
+    return existing
+
+
+def drain_outbox(batch_size=100, max_attempts=5):
+    """
+    Deliver pending outbox entries in batches; returns the number of entries processed.
+    Each entry is claimed and fanned out inside its own SAVEPOINT, and a batch is
+    committed as a whole, so an entry is delivered exactly once even with several
+    workers draining. An entry that fails is rolled back alone, skipped for the rest
+    of this drain, and closed with its error after `max_attempts` failures.
+    """
+    processed = 0
+    failed_ids = set()
+    while True:
+        query = NotificationOutbox.query.filter(NotificationOutbox.processed_at.is_(None))
+        if failed_ids:
+            query = query.filter(NotificationOutbox.id.notin_(failed_ids))
+        pending = query.order_by(NotificationOutbox.id).limit(batch_size).all()
+        if not pending:
+            return processed
+
+        now = datetime.utcnow()
+        objs = []
+        for entry in pending:
+            entry_id, attempts = entry.id, entry.attempts
+            try:
+                with db.session.begin_nested():
+                    claimed = NotificationOutbox.query \
+                        .filter_by(id=entry_id, processed_at=None) \
+                        .update({"processed_at": now}, synchronize_session=False)
+                    if not claimed:
+                        continue   # another worker got it
+                    entry_objs = build_notifications(
+                        resolve_recipients(entry), entry.message, entry.object_type, entry.object_id,
+                        json.loads(entry.extra) if entry.extra else None,
+                    )
+                    save_notifications(entry_objs)
+            except Exception as e:
+                failed_ids.add(entry_id)
+                gave_up = attempts + 1 >= max_attempts
+                NotificationOutbox.query.filter_by(id=entry_id).update({
+                    "attempts": attempts + 1,
+                    "last_error": f"{type(e).__name__}: {e}"[:255],
+                    "processed_at": now if gave_up else None,
+                }, synchronize_session=False)
+                current_app.logger.warning("Outbox entry %s failed (attempt %s%s): %s", entry_id,
+                                           attempts + 1, ", giving up" if gave_up else "", e)
+                continue
+            objs.extend(entry_objs)
+            processed += 1
+
+        db.session.commit()
+        publish_notifications(objs)
+
+        if len(pending) < batch_size:
+            return processed
+
+
+class OutboxWorker:
+    """Background thread that drains the outbox when woken after a commit, and on a timer."""
+
+    def __init__(self):
+        self.app = None
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        if app.config["NOTIFICATION_OUTBOX_WORKER"]:
+            # Started by the first request, so CLI commands (db upgrade, seed.py,
+            # `drain-outbox --loop`) never run a second drainer in the background
+            app.before_request(self._start)
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+                    self._thread.start()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        interval = self.app.config["NOTIFICATION_OUTBOX_INTERVAL"]
+        batch_size = self.app.config["NOTIFICATION_OUTBOX_BATCH_SIZE"]
+        max_attempts = self.app.config["NOTIFICATION_OUTBOX_MAX_ATTEMPTS"]
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    drain_outbox(batch_size, max_attempts)
+                except Exception:
+                    db.session.rollback()
+                    # A stale directory (e.g. a user deleted by another worker) is a likely cause
+                    recipient_directory.invalidate()
+                    self.app.logger.exception("Notification outbox drain failed; will retry")
+                finally:
+                    db.session.remove()
+
+
+outbox_worker = OutboxWorker()
+
+
+@notifications_cli.command("drain-outbox")
+@click.option("--loop", is_flag=True, help="Keep draining (run as a separate worker process).")
+@click.option("--interval", default=2.0, help="Seconds between drains with --loop.")
+def drain_outbox_command(loop, interval):
+    """Deliver pending notification intents."""
+    batch_size = current_app.config["NOTIFICATION_OUTBOX_BATCH_SIZE"]
+    max_attempts = current_app.config["NOTIFICATION_OUTBOX_MAX_ATTEMPTS"]
+    while True:
+        processed = drain_outbox(batch_size, max_attempts)
+        if processed or not loop:
+            click.echo(f"Delivered {processed} outbox entr{'y' if processed == 1 else 'ies'}.")
+        if not loop:
+            return
+        time.sleep(interval)
@@ -0,0 +1,111 @@
+# backend/utils/notification_retention.py
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from sqlalchemy import and_, delete, insert, or_
+from models import db, Notification, NotificationArchive, NotificationOutbox
+from utils.notifications import adjust_unread, notifications_cli
+
+ARCHIVE_COLUMNS = ["id", "user_id", "message", "object_type", "object_id", "extra", "is_read", "created_at"]
+
+
+@dataclass
+class PurgeReport:
+    purged_read: int = 0
+    purged_unread: int = 0
+    archived: int = 0
+    outbox_purged: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def purged(self):
+        return self.purged_read + self.purged_unread
+
+    def as_dict(self):
+        return {**asdict(self), "purged": self.purged}
+
+
+def purge_notifications(read_days, unread_days, batch_size=1000, archive=False, now=None):
+    """
+    Delete read notifications older than read_days and unread ones older than unread_days.
+    Works in fixed-size id batches, one short transaction each, so no long-held locks.
+    Unread counters are adjusted in the same transaction as each delete, from
+    the rows the DELETE ... RETURNING actually removed.
+    """
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    read_cutoff = now - timedelta(days=read_days)
+    unread_cutoff = now - timedelta(days=unread_days)
+    report = PurgeReport()
+
+    expired = or_(
+        and_(Notification.is_read.is_(True), Notification.created_at < read_cutoff),
+        and_(Notification.is_read.is_(False), Notification.created_at < unread_cutoff),
+    )
+
+    while True:
+        ids = [row.id for row in db.session.query(Notification.id)
+               .filter(expired).order_by(Notification.id).limit(batch_size)]
+        if not ids:
+            break
+
+        # Re-check the retention predicate in the DELETE itself and count from what it
+        # actually removed, so a notification marked read meanwhile isn't decremented twice
+        rows = db.session.execute(
+            delete(Notification).where(Notification.id.in_(ids), expired)
+            .returning(*[getattr(Notification, c) for c in ARCHIVE_COLUMNS])
+        ).all()
+        if archive and rows:
+            db.session.execute(insert(NotificationArchive),
+                               [{**row._asdict(), "archived_at": now} for row in rows])
+            report.archived += len(rows)
+
+        unread = Counter(row.user_id for row in rows if not row.is_read)
+        adjust_unread({user_id: -count for user_id, count in unread.items()})
+        db.session.commit()
+
+        report.purged_unread += sum(unread.values())
+        report.purged_read += len(rows) - sum(unread.values())
+        report.batches += 1
+        if len(ids) < batch_size:
+            break
+
+    # Delivered outbox entries are only kept as long as read notifications
+    while True:
+        ids = [row.id for row in db.session.query(NotificationOutbox.id)
+               .filter(NotificationOutbox.processed_at < read_cutoff).limit(batch_size)]
+        if not ids:
+            break
+        NotificationOutbox.query.filter(NotificationOutbox.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        report.outbox_purged += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+@notifications_cli.command("purge")
+@click.option("--read-days", type=int, help="Override NOTIFICATION_RETENTION_READ_DAYS.")
+@click.option("--unread-days", type=int, help="Override NOTIFICATION_RETENTION_UNREAD_DAYS.")
+@click.option("--batch-size", type=int, help="Override NOTIFICATION_PURGE_BATCH_SIZE.")
+@click.option("--archive/--no-archive", default=None, help="Override NOTIFICATION_ARCHIVE.")
+def purge_command(read_days, unread_days, batch_size, archive):
+    """Delete (or archive) notifications past their retention window."""
+    config = current_app.config
+    report = purge_notifications(
+        read_days if read_days is not None else config["NOTIFICATION_RETENTION_READ_DAYS"],
+        unread_days if unread_days is not None else config["NOTIFICATION_RETENTION_UNREAD_DAYS"],
+        batch_size or config["NOTIFICATION_PURGE_BATCH_SIZE"],
+        config["NOTIFICATION_ARCHIVE"] if archive is None else archive,
+    )
+    click.echo(
+        f"Purged {report.purged} notification(s) ({report.purged_read} read, {report.purged_unread} unread), "
+        f"archived {report.archived}, removed {report.outbox_purged} outbox entr"
+        f"{'y' if report.outbox_purged == 1 else 'ies'} in {report.batches} batch(es), {report.seconds}s."
+    )
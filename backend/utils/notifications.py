@@ -1,18 +1,150 @@
 # backend/utils/notifications.py
-from models import Notification, db
+from collections import Counter
+from flask.cli import AppGroup
+from sqlalchemy import func
+from models import Notification, NotificationCounter, db
+from utils.notification_broker import broker
 from datetime import datetime
 import json
+import click
 
 def create_notifications_for_users(user_ids, message, object_type=None, object_id=None, extra=None):
-    objs = []
-    for uid in set(user_ids):
-        objs.append(Notification(
+    objs = build_notifications(user_ids, message, object_type, object_id, extra)
+    save_notifications(objs)
+    db.session.commit()
+
+    publish_notifications(objs)
+
+
+def build_notifications(user_ids, message, object_type=None, object_id=None, extra=None):
+    created_at = datetime.utcnow()
+    return [
+        Notification(
             user_id=uid,
             message=message,
             object_type=object_type,
             object_id=object_id,
             extra=json.dumps(extra) if extra else None,
-            created_at=datetime.utcnow()
-        ))
+            created_at=created_at
+        )
+        for uid in set(user_ids)
+    ]
+
+
+def save_notifications(objs):
+    """Bulk insert + counter update inside the caller's transaction (no commit)."""
     db.session.bulk_save_objects(objs)
+    adjust_unread(Counter(o.user_id for o in objs))
+
+
+def publish_notifications(objs):
+    """Push committed notifications to connected /notifications/stream clients."""
+    for n in objs:
+        broker.publish(n.user_id, {
+            "message": n.message,
+            "object_type": n.object_type,
+            "object_id": n.object_id,
+            "created_at": n.created_at.isoformat(),
+        })
+
+
+def adjust_unread(deltas):
+    """
+    Apply {user_id: delta} to the unread counters inside the caller's transaction.
+    A single INSERT ... ON CONFLICT DO UPDATE SET unread = unread + delta, so
+    concurrent writers neither lose updates nor race to create the row.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    insert = dialect_insert()
+    if insert is None:
+        for user_id, delta in deltas.items():
+            updated = NotificationCounter.query.filter_by(user_id=user_id) \
+                .update({"unread": NotificationCounter.unread + delta}, synchronize_session=False)
+            if not updated:
+                db.session.add(NotificationCounter(user_id=user_id, unread=max(delta, 0)))
+        return
+
+    table = NotificationCounter.__table__
+    for user_id, delta in deltas.items():
+        statement = insert(table).values(user_id=user_id, unread=max(delta, 0))
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id], set_={"unread": table.c.unread + delta},
+        ))
+
+
+def dialect_insert():
+    """The dialect's insert() with ON CONFLICT support, or None on other databases."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def get_unread_count(user_id):
+    counter = db.session.get(NotificationCounter, user_id)
+    return max(counter.unread, 0) if counter else 0
+
+
+def mark_notification_read(user_id, notif_id):
+    """Returns False if the notification doesn't exist for this user."""
+    changed = Notification.query.filter_by(id=notif_id, user_id=user_id, is_read=False) \
+        .update({"is_read": True}, synchronize_session=False)
+    if not changed and not Notification.query.filter_by(id=notif_id, user_id=user_id).first():
+        return False
+    adjust_unread({user_id: -changed})
+    db.session.commit()
+    return True
+
+
+def mark_all_notifications_read(user_id):
+    changed = Notification.query.filter_by(user_id=user_id, is_read=False) \
+        .update({"is_read": True}, synchronize_session=False)
+    adjust_unread({user_id: -changed})
+    db.session.commit()
+    return changed
+
+
+def recount_unread(user_ids=None):
+    """
+    Repair job: recompute counters from the notifications table.
+    Returns the number of counters that were wrong (or missing).
+    """
+    counts_query = db.session.query(Notification.user_id, func.count(Notification.id)) \
+        .filter(Notification.is_read.is_(False))
+    counters_query = NotificationCounter.query
+    if user_ids is not None:
+        counts_query = counts_query.filter(Notification.user_id.in_(user_ids))
+        counters_query = counters_query.filter(NotificationCounter.user_id.in_(user_ids))
+
+    actual = dict(counts_query.group_by(Notification.user_id).all())
+    fixed = 0
+
+    for counter in counters_query.all():
+        expected = actual.pop(counter.user_id, 0)
+        if counter.unread != expected:
+            counter.unread = expected
+            fixed += 1
+
+    for user_id, unread in actual.items():
+        db.session.add(NotificationCounter(user_id=user_id, unread=unread))
+        fixed += 1
+
     db.session.commit()
+    return fixed
+
+
+notifications_cli = AppGroup("notifications", help="Notification maintenance jobs.")
+
+
+@notifications_cli.command("repair-counters")
+@click.option("--user-id", "user_ids", type=int, multiple=True, help="Limit to these users.")
+def repair_counters_command(user_ids):
+    """Recompute unread counters from the notifications table."""
+    fixed = recount_unread(list(user_ids) or None)
+    click.echo(f"Repaired {fixed} unread counter(s).")
@@ -0,0 +1,97 @@
+# backend/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from utils.projections import fetch_all
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor from the sort-key values of a row."""
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, order):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(raw, list) or len(raw) != len(order):
+        raise ValueError("Invalid cursor")
+
+    values = []
+    for (column, _), value in zip(order, raw):
+        if value is not None:
+            expected = column.type.python_type
+            if expected is datetime:
+                if not isinstance(value, str):
+                    raise ValueError("Invalid cursor")
+                try:
+                    value = datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    raise ValueError("Invalid cursor")
+            elif expected in (int, str) and type(value) is not expected:
+                raise ValueError("Invalid cursor")
+        values.append(value)
+    return values
+
+
+def keyset_condition(order, values):
+    """
+    Rows strictly after `values` in the given order, where order is
+    [(column, descending), ...]. Expanded to an OR of prefixes so mixed
+    directions (e.g. created_at DESC, id ASC) can still use a matching index.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        prefix = [c == v for (c, _), v in zip(order[:i], values[:i])]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+
+def order_by_clauses(order, reverse=False):
+    return [
+        (column.asc() if descending == reverse else column.desc())
+        for column, descending in order
+    ]
+
+
+def keyset_paginate(query, order, limit, after=None, before=None, key=None):
+    """
+    Seek-based pagination: every page costs the same as the first, no OFFSET, no COUNT.
+    Works with a legacy Query or a select() (e.g. a Projection's statement).
+
+    order  -- [(column, descending), ...]; must end in a unique column (usually id)
+    after  -- cursor: return the page following this row
+    before -- cursor: return the page preceding this row
+    key    -- row -> tuple of sort values (defaults to attributes named like the columns)
+
+    Returns (items, next_cursor, prev_cursor); a cursor is None when there is no such page.
+    """
+    if key is None:
+        names = [column.key for column, _ in order]
+        key = lambda row: tuple(getattr(row, name) for name in names)
+
+    backwards = before is not None and after is None
+    if after is not None:
+        query = query.filter(keyset_condition(order, decode_cursor(after, order)))
+    elif backwards:
+        flipped = [(column, not descending) for column, descending in order]
+        query = query.filter(keyset_condition(flipped, decode_cursor(before, order)))
+
+    rows = fetch_all(query.order_by(*order_by_clauses(order, reverse=backwards)).limit(limit + 1))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    first = encode_cursor(key(rows[0])) if rows else None
+    last = encode_cursor(key(rows[-1])) if rows else None
+
+    if backwards:
+        return rows, (last if rows else None), (first if has_more else None)
+    return rows, (last if has_more else None), (first if after is not None and rows else None)
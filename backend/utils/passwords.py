@@ -0,0 +1,144 @@
+# backend/utils/passwords.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from extensions import bcrypt
+from models import db, User
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated (e.g. a login storm)."""
+
+
+class PasswordHasher:
+    """
+    Central bcrypt service shared by login, register, admin user management and seed.py.
+
+    - Cost comes from BCRYPT_LOG_ROUNDS, or is calibrated once to hit
+      BCRYPT_TARGET_MS when that is set; the first worker to calibrate writes
+      the result to BCRYPT_CALIBRATION_FILE and every other worker reuses it.
+    - All hashing runs on a bounded worker pool; callers wait for their result,
+      but at most PASSWORD_HASH_WORKERS hashes burn CPU at once and at most
+      PASSWORD_HASH_QUEUE more may wait, so request threads are never starved.
+    - Hashes made at a lower cost are rehashed in the background after a
+      successful login (never downgraded).
+    """
+
+    def __init__(self):
+        self.rounds = 12
+        self.timeout = 10
+        self._pool = None
+        self._slots = None
+
+    def init_app(self, app):
+        config = app.config
+        self.timeout = config["PASSWORD_HASH_TIMEOUT"]
+
+        if config["BCRYPT_TARGET_MS"]:
+            path = config["BCRYPT_CALIBRATION_FILE"] or os.path.join(app.instance_path, "bcrypt-rounds")
+            self.rounds = self.shared_calibration(
+                path, config["BCRYPT_TARGET_MS"], config["BCRYPT_MIN_ROUNDS"], config["BCRYPT_MAX_ROUNDS"]
+            )
+            app.logger.info("bcrypt cost calibrated to %s rounds", self.rounds)
+        else:
+            self.rounds = config["BCRYPT_LOG_ROUNDS"]
+        config["BCRYPT_LOG_ROUNDS"] = self.rounds
+
+        workers = config["PASSWORD_HASH_WORKERS"]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+            self._slots = threading.BoundedSemaphore(workers + config["PASSWORD_HASH_QUEUE"])
+
+    @staticmethod
+    def calibrate(target_ms, min_rounds, max_rounds):
+        """Pick the highest cost whose hash time stays within target_ms (each round doubles the work)."""
+        start = time.perf_counter()
+        bcrypt.generate_password_hash("calibration", min_rounds)
+        base_ms = (time.perf_counter() - start) * 1000
+
+        rounds = min_rounds
+        while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+            rounds += 1
+        return rounds
+
+    @classmethod
+    def shared_calibration(cls, path, target_ms, min_rounds, max_rounds):
+        """
+        The cost stored at `path`, or calibrate and store it. The file is
+        published with os.link, so exactly one worker's result wins and the
+        others read it instead of trusting their own noisy timings.
+        """
+        rounds = cls._read_rounds(path, min_rounds, max_rounds)
+        if rounds is not None:
+            return rounds
+
+        rounds = cls.calibrate(target_ms, min_rounds, max_rounds)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="ascii") as fh:
+            fh.write(str(rounds))
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            rounds = cls._read_rounds(path, min_rounds, max_rounds) or rounds
+        finally:
+            os.remove(tmp)
+        return rounds
+
+    @staticmethod
+    def _read_rounds(path, min_rounds, max_rounds):
+        try:
+            with open(path, encoding="ascii") as fh:
+                rounds = int(fh.read().strip())
+        except (OSError, ValueError):
+            return None
+        return rounds if min_rounds <= rounds <= max_rounds else None
+
+    @staticmethod
+    def cost_of(pw_hash):
+        """'$2b$12$...' -> 12"""
+        try:
+            return int(pw_hash.split("$")[2])
+        except (IndexError, ValueError):
+            return None
+
+    def needs_rehash(self, pw_hash):
+        cost = self.cost_of(pw_hash)
+        return cost is None or cost < self.rounds
+
+    def _run(self, fn, *args, block=True):
+        if not self._slots.acquire(timeout=self.timeout if block else 0):
+            raise PasswordHasherBusy()
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash_password(self, password):
+        future = self._run(bcrypt.generate_password_hash, password, self.rounds)
+        return future.result().decode("utf-8")
+
+    def check_password(self, pw_hash, password):
+        return self._run(bcrypt.check_password_hash, pw_hash, password).result()
+
+    def rehash_later(self, app, user_id, old_hash, password):
+        """Best effort: skipped when the pool is busy, retried on the next login."""
+        try:
+            self._run(self._rehash, app, user_id, old_hash, password, block=False)
+        except PasswordHasherBusy:
+            pass
+
+    def _rehash(self, app, user_id, old_hash, password):
+        new_hash = bcrypt.generate_password_hash(password, self.rounds).decode("utf-8")
+        with app.app_context():
+            try:
+                # Only swap if nobody changed the password in the meantime
+                User.query.filter_by(id=user_id, password_hash=old_hash) \
+                    .update({"password_hash": new_hash})
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Background rehash failed for user %s", user_id)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,90 @@
+# backend/utils/principal_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from config import Config
+
+
+class Principal(NamedTuple):
+    """Minimal, immutable view of the authenticated user."""
+    id: int
+    username: str
+    role: str
+
+
+class PrincipalCache:
+    """
+    Thread-safe TTL + LRU cache of Principal objects keyed by user_id.
+    Keeps the per-request auth lookup off the database.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # user_id -> (expires_at, principal)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.trusted = 0              # principals built straight from token claims
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[user_id]
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, principal):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[principal.id] = (expires_at, principal)
+            self._data.move_to_end(principal.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def from_claims(self, claims):
+        """Build a Principal from verified JWT claims without touching the DB."""
+        with self._lock:
+            self.trusted += 1
+        return Principal(claims["user_id"], claims.get("username"), claims.get("role"))
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "mode": "claims" if Config.AUTH_TRUST_TOKEN_CLAIMS else "cache",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "trusted": self.trusted,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+principal_cache = PrincipalCache(
+    maxsize=Config.PRINCIPAL_CACHE_SIZE,
+    ttl=Config.PRINCIPAL_CACHE_TTL,
+)
+
+
+def invalidate_principal(user_id):
+    """Call whenever a user's username/role changes or the user is deleted."""
+    principal_cache.invalidate(user_id)
@@ -0,0 +1,62 @@
+# backend/utils/projections.py
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+from extensions import db
+
+
+def iso(value):
+    return value.isoformat() if value else None
+
+
+class Projection:
+    """
+    Declarative read model for a list endpoint.
+
+    Compiles once, at import, into a select() of only the columns the endpoint
+    returns (plus the outer joins those columns need). Rows come back as plain
+    SQLAlchemy Row tuples: no identity map, no relationship proxies. Filter or
+    order with the usual .where()/.order_by() on `projection.statement`.
+
+        Projection(Installation, [
+            ("id", Installation.id),
+            ("technician_name", User.username),
+            ("scheduled_date", Installation.scheduled_date, iso),
+        ], joins=[(User, User.id == Installation.technician_id)])
+    """
+
+    def __init__(self, base, fields, joins=()):
+        self.names = tuple(field[0] for field in fields)
+        self.formatters = tuple(field[2] if len(field) > 2 else None for field in fields)
+        self.columns = {field[0]: field[1] for field in fields}
+
+        statement = select(*[column.label(name) for name, column in self.columns.items()]).select_from(base)
+        for target, onclause in joins:
+            statement = statement.outerjoin(target, onclause)
+        self.statement = statement
+
+    def serialize(self, row):
+        return {
+            name: (formatter(value) if formatter else value)
+            for name, formatter, value in zip(self.names, self.formatters, row)
+        }
+
+    def rows(self, statement=None):
+        return db.session.execute(self.statement if statement is None else statement).all()
+
+
+def fetch_all(query):
+    """.all() for a legacy Query or a 2.0-style select()."""
+    if isinstance(query, Select):
+        return db.session.execute(query).all()
+    return query.all()
+
+
+def iterate_batched(query, batch_size):
+    """Iterate rows fetched batch_size at a time (server-side cursor where supported)."""
+    if isinstance(query, Select):
+        return db.session.execute(query.execution_options(yield_per=batch_size))
+    return query.yield_per(batch_size)
+
+
+def count_rows(statement):
+    return db.session.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
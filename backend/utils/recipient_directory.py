@@ -0,0 +1,50 @@
+# backend/utils/recipient_directory.py
+import threading
+import time
+from array import array
+from models import db, User
+from config import Config
+
+
+class RecipientDirectory:
+    """
+    In-memory role -> user ids map used for notification fan-out.
+    Loaded with a single two-column query, stored as compact int arrays, and
+    invalidated by the user-management routes. The TTL is a backstop for
+    changes made by other worker processes.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._by_role = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _snapshot(self):
+        by_role = self._by_role
+        if by_role is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return by_role
+
+        with self._lock:
+            if self._by_role is None or time.monotonic() - self._loaded_at >= self.ttl:
+                grouped = {}
+                for user_id, role in db.session.query(User.id, User.role).order_by(User.id):
+                    grouped.setdefault(role, array("i")).append(user_id)
+                self._by_role = grouped
+                self._loaded_at = time.monotonic()
+            return self._by_role
+
+    def recipients_for(self, roles, extra_ids=()):
+        """Set of user ids holding any of `roles`, plus `extra_ids`."""
+        by_role = self._snapshot()
+        recipients = {uid for uid in extra_ids if uid}
+        for role in roles:
+            recipients.update(by_role.get(role, ()))
+        return recipients
+
+    def invalidate(self):
+        with self._lock:
+            self._by_role = None
+
+
+recipient_directory = RecipientDirectory(ttl=Config.RECIPIENT_DIRECTORY_TTL)
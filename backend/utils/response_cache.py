@@ -0,0 +1,295 @@
+# backend/utils/response_cache.py
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import make_response, request
+from sqlalchemy import event
+from models import db
+from config import Config
+
+
+class CachedResponse:
+    __slots__ = ("version", "etag", "status", "mimetype", "body", "stored_at")
+
+    def __init__(self, version, etag, status, mimetype, body, stored_at=None):
+        self.version = version
+        self.etag = etag
+        self.status = status
+        self.mimetype = mimetype
+        self.body = body
+        self.stored_at = stored_at or time.time()
+
+    def to_dict(self):
+        return {"version": self.version, "etag": self.etag, "status": self.status, "mimetype": self.mimetype,
+                "body": self.body.decode("utf-8"), "stored_at": self.stored_at}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["version"], data["etag"], data["status"], data["mimetype"],
+                   data["body"].encode("utf-8"), data["stored_at"])
+
+
+class MemoryBackend:
+    """Per-process LRU of responses plus per-table version counters."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, tables):
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FilesystemBackend:
+    """
+    Responses as JSON files and table versions as flock-guarded counter files
+    in a shared directory, so every worker process sees the same ETags.
+    """
+
+    def __init__(self, directory, max_entries=256):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries_dir = os.path.join(directory, "entries")
+        self._versions_dir = os.path.join(directory, "versions")
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._versions_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self._entries_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._entry_path(key), encoding="utf-8") as fh:
+                return CachedResponse.from_dict(json.load(fh))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key, entry):
+        path = self._entry_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(entry.to_dict(), fh)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self):
+        names = [n for n in os.listdir(self._entries_dir) if n.endswith(".json")]
+        if len(names) <= self.max_entries:
+            return
+        paths = sorted((os.path.join(self._entries_dir, n) for n in names), key=_mtime)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _version_path(self, table):
+        return os.path.join(self._versions_dir, table)
+
+    def versions(self, tables):
+        result = []
+        for table in tables:
+            try:
+                with open(self._version_path(table), encoding="ascii") as fh:
+                    result.append(int(fh.read() or 0))
+            except (OSError, ValueError):
+                result.append(0)
+        return tuple(result)
+
+    def bump(self, tables):
+        for table in tables:
+            fd = os.open(self._version_path(table), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                current = os.read(fd, 32)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, str(int(current or 0) + 1).encode("ascii"))
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def clear(self):
+        for name in os.listdir(self._entries_dir):
+            try:
+                os.remove(os.path.join(self._entries_dir, name))
+            except OSError:
+                pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+class ResponseCache:
+    """
+    Conditional-GET cache for read-mostly endpoints.
+
+    A stored response is current while the version counters of the tables it
+    reads are unchanged (commits that touch those tables bump them) and it is
+    younger than the TTL; a current entry is replayed without running the
+    view, and a matching If-None-Match gets a 304. The counters are only an
+    internal staleness check: the ETag itself is a hash of the response body,
+    so workers whose counters differ (or restart at 0) never hand out the same
+    ETag for different bodies.
+    """
+
+    def __init__(self, backend=None, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def key_for(self, role):
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+        return f"{request.endpoint}|{role or ''}|{query}"
+
+    def version_for(self, tables):
+        return ",".join(f"{t}:{v}" for t, v in zip(tables, self.backend.versions(tables)))
+
+    @staticmethod
+    def etag_for(body):
+        return hashlib.sha1(body).hexdigest()[:20]
+
+    def fresh(self, entry, version):
+        return entry is not None and entry.version == version and time.time() - entry.stored_at < self.ttl
+
+    def bump(self, tables):
+        if self.enabled and tables:
+            self.backend.bump(sorted(tables))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "not_modified": self.not_modified,
+                "backend": type(self.backend).__name__ if self.backend else None}
+
+
+def _backend_from_config():
+    if Config.RESPONSE_CACHE_BACKEND == "filesystem":
+        return FilesystemBackend(Config.RESPONSE_CACHE_DIR, Config.RESPONSE_CACHE_SIZE)
+    if Config.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryBackend(Config.RESPONSE_CACHE_SIZE)
+    return None
+
+
+response_cache = ResponseCache(_backend_from_config(), ttl=Config.RESPONSE_CACHE_TTL)
+
+
+def cached_response(*tables, per_role=True):
+    """
+    Cache a GET view's response keyed by endpoint + query string (+ caller role),
+    invalidated when a commit touches any of `tables`.
+    Place it directly above the view function, below the auth decorators.
+    Usage: @cached_response("invoices", "installations")
+    """
+    tables = tuple(sorted(tables))
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorated(*args, **kwargs):
+            if not response_cache.enabled or request.method != "GET":
+                return fn(*args, **kwargs)
+
+            user = getattr(request, "user", None)
+            key = response_cache.key_for(user.role if per_role and user else None)
+            version = response_cache.version_for(tables)
+            entry = response_cache.backend.get(key)
+
+            if response_cache.fresh(entry, version):
+                etag = entry.etag
+                if etag in request.if_none_match:
+                    response_cache.not_modified += 1
+                    response = make_response("", 304)
+                else:
+                    response_cache.hits += 1
+                    response = make_response(entry.body, entry.status)
+                    response.mimetype = entry.mimetype
+            else:
+                response_cache.misses += 1
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                etag = response_cache.etag_for(body)
+                response_cache.backend.set(
+                    key, CachedResponse(version, etag, response.status_code, response.mimetype, body)
+                )
+                if etag in request.if_none_match:
+                    response_cache.not_modified += 1
+                    response = make_response("", 304)
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return decorated
+    return wrapper
+
+
+# Table versions: collect the tables each transaction wrote, bump them after commit
+
+def _touch(session, table):
+    session.info.setdefault("touched_tables", set()).add(table)
+
+
+@event.listens_for(db.session, "before_flush")
+def _collect_touched_tables(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            _touch(session, table)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state):
+    # Query.update() / .delete() skip the flush
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is not None:
+        _touch(orm_execute_state.session, orm_execute_state.bind_mapper.local_table.name)
+
+
+@event.listens_for(db.session, "after_commit")
+def _bump_after_commit(session):
+    tables = session.info.pop("touched_tables", None)
+    if tables:
+        response_cache.bump(tables)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("touched_tables", None)
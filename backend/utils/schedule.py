@@ -0,0 +1,97 @@
+# backend/utils/schedule.py
+from datetime import timedelta
+from sqlalchemy import and_, or_
+from models import db, Installation, User
+from config import Config
+from utils.datetimes import naive_utc
+
+DEFAULT_DURATION = timedelta(hours=Config.SCHEDULE_DEFAULT_DURATION_HOURS)
+MAX_DURATION = timedelta(days=Config.SCHEDULE_MAX_BOOKING_DAYS)
+# No booking is longer than this, so one overlapping [start, end) starts after start - MAX_SPAN
+MAX_SPAN = max(DEFAULT_DURATION, MAX_DURATION)
+
+
+class ScheduleError(Exception):
+    def __init__(self, message, status=400, conflict_id=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.conflict_id = conflict_id
+
+
+def booking_end(start, end):
+    """A booking without an end_date blocks SCHEDULE_DEFAULT_DURATION_HOURS from its start."""
+    return end if end is not None else start + DEFAULT_DURATION
+
+
+def _bookings(technician_id, exclude_id=None):
+    query = db.session.query(Installation.id, Installation.scheduled_date, Installation.end_date) \
+        .filter(Installation.technician_id == technician_id, Installation.scheduled_date.isnot(None))
+    if exclude_id is not None:
+        query = query.filter(Installation.id != exclude_id)
+    return query
+
+
+def _overlapping(technician_id, start, end, exclude_id=None):
+    """
+    The technician's bookings overlapping [start, end), in start order. The
+    real interval test (start < end and booking end > start, with a missing
+    end_date counting as DEFAULT_DURATION), so rows saved before overlaps were
+    rejected are still caught. Bookings are at most MAX_SPAN long, so this is
+    a range scan of (technician_id, scheduled_date) over (start - MAX_SPAN, end).
+    """
+    return _bookings(technician_id, exclude_id).filter(
+        Installation.scheduled_date > start - MAX_SPAN,
+        Installation.scheduled_date < end,
+        or_(Installation.end_date > start,
+            and_(Installation.end_date.is_(None), Installation.scheduled_date > start - DEFAULT_DURATION)),
+    ).order_by(Installation.scheduled_date, Installation.id)
+
+
+def find_conflict(technician_id, start, end=None, exclude_id=None):
+    """The earliest booking that overlaps [start, end) for this technician, or None."""
+    start, end = naive_utc(start), naive_utc(end)
+    return _overlapping(technician_id, start, booking_end(start, end), exclude_id).first()
+
+
+def ensure_available(technician_id, start, end=None, exclude_id=None):
+    """
+    Raise ScheduleError unless [start, end) is free for the technician.
+    Locks the technician's row (SELECT ... FOR UPDATE where supported) so
+    concurrent bookings for the same technician serialize until commit; on
+    PostgreSQL the ex_installations_technician_booking exclusion constraint
+    backs this up in the database.
+    """
+    if technician_id is None or start is None:
+        return
+    if end is not None and naive_utc(end) <= naive_utc(start):
+        raise ScheduleError("end_date must be after scheduled_date")
+    if end is not None and naive_utc(end) - naive_utc(start) > MAX_DURATION:
+        raise ScheduleError(f"A booking cannot be longer than {Config.SCHEDULE_MAX_BOOKING_DAYS} days")
+    db.session.query(User.id).filter(User.id == technician_id).with_for_update().first()
+    conflict = find_conflict(technician_id, start, end, exclude_id)
+    if conflict is not None:
+        raise ScheduleError(f"Technician is already booked for Installation #{conflict.id}",
+                            status=409, conflict_id=conflict.id)
+
+
+def bookings_between(technician_id, start, end):
+    """The technician's bookings overlapping [start, end), in start order."""
+    return _overlapping(technician_id, start, end).all()
+
+
+def availability(technician_id, start, end):
+    """Bookings and free gaps for the technician within [start, end)."""
+    start, end = naive_utc(start), naive_utc(end)
+    booked, free, cursor = [], [], start
+    for row in bookings_between(technician_id, start, end):
+        row_end = booking_end(row.scheduled_date, row.end_date)
+        booked.append({"installation_id": row.id, "start": row.scheduled_date.isoformat(),
+                       "end": row_end.isoformat()})
+        if row.scheduled_date > cursor:
+            free.append({"start": cursor.isoformat(), "end": row.scheduled_date.isoformat()})
+        cursor = max(cursor, row_end)
+    if cursor < end:
+        free.append({"start": cursor.isoformat(), "end": end.isoformat()})
+    return {"technician_id": technician_id, "from": start.isoformat(), "to": end.isoformat(),
+            "bookings": booked, "free": free}
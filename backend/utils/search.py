@@ -0,0 +1,236 @@
+# backend/utils/search.py
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, or_, text
+from models import db, User, Customer, Installation, Invoice, Ticket
+from config import Config
+
+search_cli = AppGroup("search")
+
+# code: stable small int per entity, packed into the FTS rowid as id * 8 + code
+class SearchEntity(namedtuple("SearchEntity", "name model code fields payload")):
+    """fields: searched columns; payload: columns returned for each hit."""
+
+    def serialize(self, row):
+        return {name: getattr(row, name) for name in self.payload}
+
+
+SEARCH_ENTITIES = [
+    SearchEntity("customers", Customer, 1, ("name", "email", "phone"), ("id", "name", "email", "phone")),
+    SearchEntity("users", User, 2, ("username", "email", "role"), ("id", "username", "email", "role")),
+    SearchEntity("installations", Installation, 3, ("customer_name", "package_type", "status"),
+                 ("id", "customer_name", "package_type", "status", "price")),
+    SearchEntity("invoices", Invoice, 4, ("status",), ("id", "amount", "status")),
+    SearchEntity("tickets", Ticket, 5, ("issue", "status"), ("id", "issue", "status")),
+]
+ENTITIES_BY_CODE = {entity.code: entity for entity in SEARCH_ENTITIES}
+ROWID_STRIDE = 8
+FTS_TABLE = "search_fts"
+FTS_MIN_QUERY = 3  # the trigram tokenizer can't match shorter strings
+IN_CHUNK = 500
+
+
+def _columns(entity):
+    return [getattr(entity.model, field) for field in entity.fields]
+
+
+def _substring(entity, q):
+    pattern = f"%{q}%"
+    return or_(*[column.ilike(pattern) for column in _columns(entity)])
+
+
+def _payload_query(entity):
+    return db.session.query(*[getattr(entity.model, name) for name in entity.payload])
+
+
+def _load_in_order(entity, ids):
+    """Payload rows for `ids`, returned in the order of `ids`."""
+    found = {}
+    for start in range(0, len(ids), IN_CHUNK):
+        chunk = ids[start:start + IN_CHUNK]
+        for row in _payload_query(entity).filter(entity.model.id.in_(chunk)):
+            found[row.id] = row
+    return [found[i] for i in ids if i in found]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=Config.SEARCH_WORKERS, thread_name_prefix="search")
+    return _pool
+
+
+class LikeSearch:
+    """
+    Portable fallback: ILIKE '%q%' per field, ordered by id.
+
+    search() returns {entity name: [payload dict, ...]} for the requested
+    entities, at most `limit` hits each after skipping `offset`. Each entity is
+    queried by search_entity() on the shared bounded pool, in its own app
+    context (and so its own session / connection), so latency tracks the
+    slowest entity rather than the sum.
+    """
+    name = "like"
+
+    def search(self, q, entities=SEARCH_ENTITIES, limit=None, offset=0):
+        if len(entities) <= 1:
+            return {entity.name: self.search_entity(entity, q, limit, offset) for entity in entities}
+
+        app = current_app._get_current_object()
+
+        def run(entity):
+            with app.app_context():
+                try:
+                    return self.search_entity(entity, q, limit, offset)
+                finally:
+                    db.session.remove()
+
+        futures = [(entity, _executor().submit(run, entity)) for entity in entities]
+        return {entity.name: future.result() for entity, future in futures}
+
+    def order_by(self, entity, q):
+        return [entity.model.id]
+
+    def search_entity(self, entity, q, limit=None, offset=0):
+        rows = _payload_query(entity).filter(_substring(entity, q)) \
+            .order_by(*self.order_by(entity, q)).offset(offset).limit(limit)
+        return [entity.serialize(row) for row in rows]
+
+
+class TrigramSearch(LikeSearch):
+    """
+    PostgreSQL: the same ILIKE predicates, served by pg_trgm GIN indexes on every
+    searchable column, ranked by best field similarity.
+    """
+    name = "trigram"
+
+    def order_by(self, entity, q):
+        columns = _columns(entity)
+        rank = func.greatest(*[func.similarity(column, q) for column in columns]) \
+            if len(columns) > 1 else func.similarity(columns[0], q)
+        return [rank.desc(), entity.model.id]
+
+
+class FtsSearch(LikeSearch):
+    """
+    SQLite: one FTS5 trigram table over every entity, kept current by triggers,
+    ranked by bm25. Queries shorter than a trigram fall back to ILIKE.
+    """
+    name = "fts5"
+
+    def search_entity(self, entity, q, limit=None, offset=0):
+        if len(q) < FTS_MIN_QUERY:
+            return super().search_entity(entity, q, limit, offset)
+
+        phrase = '"' + q.replace('"', '""') + '"'
+        rowids = db.session.execute(
+            text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q AND rowid % :stride = :code "
+                 f"ORDER BY rank LIMIT :limit OFFSET :offset"),
+            {"q": phrase, "stride": ROWID_STRIDE, "code": entity.code,
+             "limit": -1 if limit is None else limit, "offset": offset},
+        ).scalars().all()
+        return [entity.serialize(row) for row in _load_in_order(entity, [r // ROWID_STRIDE for r in rowids])]
+
+
+# SQLite FTS5 schema: table, per-entity sync triggers, backfill
+
+def _fts_values(entity, alias):
+    values = [f"{alias}.{field}" for field in entity.fields]
+    values += ["NULL"] * (3 - len(values))
+    return f"{alias}.id * {ROWID_STRIDE} + {entity.code}, " + ", ".join(values)
+
+
+def sqlite_fts_ddl():
+    statements = [f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(f1, f2, f3, tokenize='trigram')"]
+    for e in SEARCH_ENTITIES:
+        table = e.model.__tablename__
+        insert_new = f"INSERT INTO {FTS_TABLE}(rowid, f1, f2, f3) VALUES ({_fts_values(e, 'new')});"
+        delete_old = f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id * {ROWID_STRIDE} + {e.code};"
+        statements += [
+            f"CREATE TRIGGER {FTS_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+            f"CREATE TRIGGER {FTS_TABLE}_{table}_au AFTER UPDATE OF {', '.join(e.fields)} ON {table} "
+            f"BEGIN {delete_old} {insert_new} END",
+            f"CREATE TRIGGER {FTS_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        ]
+    return statements
+
+
+def sqlite_fts_backfill():
+    return [
+        f"INSERT INTO {FTS_TABLE}(rowid, f1, f2, f3) SELECT {_fts_values(e, e.model.__tablename__)} "
+        f"FROM {e.model.__tablename__}"
+        for e in SEARCH_ENTITIES
+    ]
+
+
+def sqlite_fts_drop():
+    statements = [f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{e.model.__tablename__}_{suffix}"
+                  for e in SEARCH_ENTITIES for suffix in ("ai", "au", "ad")]
+    return statements + [f"DROP TABLE IF EXISTS {FTS_TABLE}"]
+
+
+def postgres_trigram_ddl():
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for e in SEARCH_ENTITIES:
+        table = e.model.__tablename__
+        statements += [
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{field}_trgm ON {table} USING gin ({field} gin_trgm_ops)"
+            for field in e.fields
+        ]
+    return statements
+
+
+def _has_fts_table():
+    return db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first() is not None
+
+
+def search_backend():
+    """The search backend for this app's database, picked once (SEARCH_BACKEND=auto|like|memory)."""
+    if Config.SEARCH_BACKEND == "memory":
+        from utils.search_index import search_index
+        if search_index.ready:
+            return search_index
+
+    backend = current_app.extensions.get("search_backend")
+    if backend is None:
+        dialect = db.engine.dialect.name
+        if Config.SEARCH_BACKEND == "like":
+            backend = LikeSearch()
+        elif dialect == "postgresql":
+            backend = TrigramSearch()
+        elif dialect == "sqlite" and _has_fts_table():
+            backend = FtsSearch()
+        else:
+            backend = LikeSearch()
+        current_app.extensions["search_backend"] = backend
+    return backend
+
+
+@search_cli.command("rebuild")
+def rebuild_command():
+    """(Re)create the full-text search index for the current database."""
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        for statement in sqlite_fts_drop() + sqlite_fts_ddl() + sqlite_fts_backfill():
+            db.session.execute(text(statement))
+    elif dialect == "postgresql":
+        for statement in postgres_trigram_ddl():
+            db.session.execute(text(statement))
+    else:
+        click.echo(f"No full-text index for {dialect}; searches use ILIKE.")
+        return
+    db.session.commit()
+    current_app.extensions.pop("search_backend", None)
+    click.echo(f"Search index rebuilt ({dialect}).")
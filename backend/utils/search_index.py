@@ -0,0 +1,333 @@
+# backend/utils/search_index.py
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+import click
+from flask import current_app
+from sqlalchemy import event
+from models import db
+from utils.search import SEARCH_ENTITIES, ENTITIES_BY_CODE, ROWID_STRIDE, search_cli
+
+MAX_GRAM = 3
+SNAPSHOT_VERSION = 2
+MODEL_ENTITIES = {entity.model: entity for entity in SEARCH_ENTITIES}
+
+
+def grams(text):
+    """Every 1..MAX_GRAM-character substring of `text`."""
+    result = set()
+    for n in range(1, MAX_GRAM + 1):
+        for i in range(len(text) - n + 1):
+            result.add(text[i:i + n])
+    return result
+
+
+def _lowered(values):
+    return tuple(str(value).lower() if value is not None else "" for value in values)
+
+
+class InvertedIndex:
+    """
+    In-memory n-gram index over the searchable fields.
+
+    Postings are append-only int64 arrays of docids (id * 8 + entity code).
+    Updates append to the new grams only and leave stale ids behind; every
+    candidate is verified against the document's current text, and the
+    postings are compacted once stale entries pile up.
+    """
+
+    def __init__(self):
+        self._docs = {}        # docid -> (payload dict, lowered search fields)
+        self._postings = {}    # gram -> array("q") of docids
+        self._stale = 0
+        self._lock = threading.RLock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _add_postings(self, docid, text_grams):
+        for gram in text_grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("q")
+            postings.append(docid)
+
+    def upsert(self, code, object_id, payload, fields):
+        docid = object_id * ROWID_STRIDE + code
+        lowered = _lowered(fields)
+        with self._lock:
+            previous = self._docs.get(docid)
+            self._docs[docid] = (payload, lowered)
+            if previous is not None and previous[1] == lowered:
+                return
+            new_grams = set().union(*(grams(value) for value in lowered))
+            if previous is not None:
+                new_grams -= set().union(*(grams(value) for value in previous[1]))
+                self._stale += 1
+            self._add_postings(docid, new_grams)
+            self._maybe_compact()
+
+    def remove(self, code, object_id):
+        with self._lock:
+            if self._docs.pop(object_id * ROWID_STRIDE + code, None) is not None:
+                self._stale += 1
+                self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._stale > max(1000, len(self._docs) // 4):
+            self.compact()
+
+    def compact(self):
+        with self._lock:
+            self._postings = {}
+            for docid, (_, lowered) in self._docs.items():
+                self._add_postings(docid, set().union(*(grams(value) for value in lowered)))
+            self._stale = 0
+
+    def search(self, q, entities=SEARCH_ENTITIES, limit=None, offset=0):
+        """
+        {entity name: [payload, ...]} ranked exact field match, then prefix, then
+        substring; ties by id. Same contract as the database backends' search().
+        """
+        needle = q.lower()
+        query_grams = [needle] if len(needle) <= MAX_GRAM else \
+            [needle[i:i + MAX_GRAM] for i in range(len(needle) - MAX_GRAM + 1)]
+        hits = {entity.code: [] for entity in entities}
+
+        with self._lock:
+            postings = [self._postings.get(gram) for gram in query_grams]
+            candidates = set(min(postings, key=len)) if all(postings) else ()
+
+            for docid in candidates:
+                entries = hits.get(docid % ROWID_STRIDE)
+                doc = self._docs.get(docid)
+                if entries is None or doc is None:
+                    continue
+                payload, lowered = doc
+                if not any(needle in value for value in lowered):
+                    continue  # stale posting or n-gram false positive
+                if needle in lowered:
+                    rank = 0
+                elif any(value.startswith(needle) for value in lowered):
+                    rank = 1
+                else:
+                    rank = 2
+                entries.append((rank, docid // ROWID_STRIDE, payload))
+
+        end = None if limit is None else offset + limit
+        return {
+            ENTITIES_BY_CODE[code].name: [payload for _, _, payload in sorted(entries, key=lambda e: e[:2])[offset:end]]
+            for code, entries in hits.items()
+        }
+
+    def load_from_db(self):
+        """Full build: one column-projected query per entity."""
+        for entity in SEARCH_ENTITIES:
+            names = list(dict.fromkeys(entity.payload + entity.fields))
+            columns = [getattr(entity.model, name) for name in names]
+            for row in db.session.query(*columns).yield_per(1000):
+                self.upsert(entity.code, row.id, entity.serialize(row), [getattr(row, f) for f in entity.fields])
+        self._stale = 0
+        self.built_at = time.time()
+
+    def save(self, path):
+        """
+        Write a JSON snapshot (owner-only permissions). Postings go out as the raw
+        bytes of their int64 arrays, base64-encoded, so loading them is a memcpy.
+        """
+        with self._lock:
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "byteorder": sys.byteorder,
+                "built_at": self.built_at,
+                "docs": [[docid, payload, list(lowered)] for docid, (payload, lowered) in self._docs.items()],
+                "postings": {gram: base64.b64encode(postings.tobytes()).decode("ascii")
+                             for gram, postings in self._postings.items()},
+            }
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Index from a snapshot written by save(), or None if missing / incompatible,
+        or if the file is a symlink, owned by another user, or group/other-writable.
+        """
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        except OSError:
+            return None
+        with os.fdopen(fd, "r", encoding="utf-8") as fh:
+            st = os.fstat(fh.fileno())
+            if st.st_uid != os.getuid() or st.st_mode & 0o022:
+                return None
+            try:
+                data = json.load(fh)
+            except ValueError:
+                return None
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION \
+                or data.get("byteorder") != sys.byteorder:
+            return None
+
+        index = cls()
+        try:
+            index._docs = {docid: (payload, tuple(lowered)) for docid, payload, lowered in data["docs"]}
+            for gram, encoded in data["postings"].items():
+                postings = array("q")
+                postings.frombytes(base64.b64decode(encoded))
+                index._postings[gram] = postings
+            index.built_at = data["built_at"]
+        except (KeyError, TypeError, ValueError):
+            return None
+        return index
+
+
+class SearchIndexService:
+    """
+    Owns the live InvertedIndex for SEARCH_BACKEND=memory: warm-starts from the
+    snapshot file, applies committed changes from this process incrementally,
+    and rebuilds in the background every SEARCH_INDEX_REFRESH seconds to pick
+    up other workers' writes.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.app = None
+        self._building = False
+        self._replay = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.index is not None
+
+    def init_app(self, app):
+        if app.config["SEARCH_BACKEND"] != "memory":
+            return
+        self.app = app
+        # Loaded by the first request, so CLI commands (db upgrade, seed.py,
+        # `search snapshot`) never track changes or rebuild in the background
+        app.before_request(self._start)
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self.index = InvertedIndex.load(snapshot_path(self.app))
+                    self._thread = threading.Thread(target=self._run, name="search-index", daemon=True)
+                    self._thread.start()
+
+    def rebuild(self):
+        """
+        Build a fresh index from the database, then replay the commits that
+        landed meanwhile and swap it in under the lock, so no apply() can land
+        only in the index being replaced.
+        """
+        with self._lock:
+            self._building = True
+            self._replay = []
+        fresh = InvertedIndex()
+        try:
+            fresh.load_from_db()
+        except Exception:
+            with self._lock:
+                self._replay, self._building = [], False
+            raise
+        with self._lock:
+            for change in self._replay:
+                _apply(fresh, change)
+            self.index = fresh
+            self._replay, self._building = [], False
+        return fresh
+
+    def apply(self, changes):
+        with self._lock:
+            if self._building:
+                self._replay.extend(changes)
+            if self.index is not None:
+                for change in changes:
+                    _apply(self.index, change)
+
+    def search(self, q, entities=SEARCH_ENTITIES, limit=None, offset=0):
+        return self.index.search(q, entities, limit, offset)
+
+    def _run(self):
+        refresh = self.app.config["SEARCH_INDEX_REFRESH"]
+        if self.index is not None:
+            time.sleep(min(refresh, 30))  # serve the snapshot first, catch up shortly after boot
+        while True:
+            with self.app.app_context():
+                try:
+                    self.rebuild().save(snapshot_path(self.app))
+                except Exception:
+                    self.app.logger.exception("Search index rebuild failed; will retry")
+                finally:
+                    db.session.remove()
+            time.sleep(refresh)
+
+
+def snapshot_path(app):
+    """SEARCH_INDEX_SNAPSHOT, or search-index.json in the app's instance folder."""
+    return app.config["SEARCH_INDEX_SNAPSHOT"] or os.path.join(app.instance_path, "search-index.json")
+
+
+def _apply(index, change):
+    code, object_id, payload, fields = change
+    if payload is None:
+        index.remove(code, object_id)
+    else:
+        index.upsert(code, object_id, payload, fields)
+
+
+search_index = SearchIndexService()
+
+
+# Incremental updates: capture changed rows after each flush, apply after commit
+
+@event.listens_for(db.session, "after_flush")
+def _collect_search_changes(session, flush_context):
+    if not search_index.ready:
+        return
+    changes = session.info.setdefault("search_index_changes", {})
+    for obj in (*session.new, *session.dirty):
+        entity = MODEL_ENTITIES.get(type(obj))
+        if entity is not None:
+            changes[(entity.code, obj.id)] = (entity.serialize(obj), [getattr(obj, f) for f in entity.fields])
+    for obj in session.deleted:
+        entity = MODEL_ENTITIES.get(type(obj))
+        if entity is not None:
+            changes[(entity.code, obj.id)] = (None, None)
+
+
+@event.listens_for(db.session, "after_commit")
+def _apply_search_changes(session):
+    changes = session.info.pop("search_index_changes", None)
+    if changes:
+        search_index.apply([(code, object_id, payload, fields)
+                            for (code, object_id), (payload, fields) in changes.items()])
+
+
+@event.listens_for(db.session, "after_rollback")
+def _drop_search_changes(session):
+    session.info.pop("search_index_changes", None)
+
+
+@search_cli.command("snapshot")
+def snapshot_command():
+    """Build the in-memory search index from the database and write its snapshot file."""
+    started = time.perf_counter()
+    index = InvertedIndex()
+    index.load_from_db()
+    path = snapshot_path(current_app)
+    index.save(path)
+    click.echo(f"Indexed {len(index)} record(s) in {time.perf_counter() - started:.2f}s -> {path}")
@@ -0,0 +1,89 @@
+# backend/utils/streaming.py
+import json
+from flask import Response, jsonify, request, stream_with_context
+from utils.projections import fetch_all, iterate_batched
+
+CHUNK_SIZE = 64 * 1024   # flush to the client roughly every 64 KB
+YIELD_PER = 500          # rows fetched per round-trip (server-side cursor on Postgres)
+
+# ?format=... values that switch a collection endpoint to incremental output
+STREAM_FORMATS = {
+    "json-stream": "application/json",     # same JSON document, written incrementally
+    "ndjson": "application/x-ndjson",      # one JSON object per line
+}
+
+
+def requested_stream_format(default=None):
+    """Streaming format asked for via ?format= or an NDJSON Accept header, else `default`."""
+    fmt = request.args.get("format")
+    if fmt in STREAM_FORMATS:
+        return fmt
+    if request.accept_mimetypes.best == "application/x-ndjson":
+        return "ndjson"
+    return default
+
+
+def _chunked(pieces):
+    """Coalesce many small strings into ~CHUNK_SIZE writes."""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _json_array(rows, serialize):
+    yield "["
+    first = True
+    for row in rows:
+        yield ("" if first else ",") + json.dumps(serialize(row))
+        first = False
+    yield "]"
+
+
+def _ndjson(rows, serialize, extra=None):
+    for row in rows:
+        item = serialize(row)
+        if extra:
+            item = {**extra, **item}
+        yield json.dumps(item) + "\n"
+
+
+def stream_collection(rows, serialize, fmt="json-stream"):
+    """Stream rows as a JSON array or NDJSON without materializing the list."""
+    pieces = _ndjson(rows, serialize) if fmt == "ndjson" else _json_array(rows, serialize)
+    return Response(stream_with_context(_chunked(pieces)), mimetype=STREAM_FORMATS[fmt])
+
+
+def stream_sections(sections, fmt="json-stream"):
+    """
+    Stream several named collections: [(name, rows, serialize), ...].
+    json-stream writes {"name": [...], ...}; ndjson writes one line per row tagged with "type".
+    """
+    def pieces():
+        if fmt == "ndjson":
+            for name, rows, serialize in sections:
+                yield from _ndjson(rows, serialize, {"type": name})
+            return
+        yield "{"
+        for i, (name, rows, serialize) in enumerate(sections):
+            yield ("," if i else "") + json.dumps(name) + ":"
+            yield from _json_array(rows, serialize)
+        yield "}"
+
+    return Response(stream_with_context(_chunked(pieces())), mimetype=STREAM_FORMATS[fmt])
+
+
+def collection_response(query, serialize, default_format=None):
+    """
+    Respond with a query's (or select()'s) rows: buffered jsonify by default, or streamed in
+    constant memory (yield_per batches) when the request selects a stream format.
+    """
+    fmt = requested_stream_format(default_format)
+    if fmt:
+        return stream_collection(iterate_batched(query, YIELD_PER), serialize, fmt)
+    return jsonify([serialize(row) for row in fetch_all(query)]), 200
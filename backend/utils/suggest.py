@@ -0,0 +1,209 @@
+# backend/utils/suggest.py
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from models import db, Customer, Installation, User
+from config import Config
+
+# Columns the index is built from; writes that leave these alone don't invalidate it
+INDEXED_COLUMNS = {
+    Customer: ("name", "email"),
+    User: ("username", "email", "role"),
+    Installation: ("package_type",),
+}
+
+
+def _keys(text):
+    """
+    The full lowered text plus every later word start, so "smi" finds "Alice Smith"
+    and "smith@example.com". Nothing after an "@" starts a key: an email domain
+    (".com", "example") would otherwise match every address in it.
+    """
+    lowered = (text or "").lower().strip()
+    if not lowered:
+        return []
+    keys = [lowered]
+    local = lowered.split("@", 1)[0]
+    for i, ch in enumerate(local):
+        if ch in " ._-" and i + 1 < len(local) and local[i + 1] not in " ._-":
+            keys.append(lowered[i + 1:])
+    return keys
+
+
+def _rank(value):
+    """Shortest labels first: "Core" before "Core Plus" when typing "co"."""
+    label = value["label"] or ""
+    return len(label), label.lower(), value["type"], value["id"] or 0
+
+
+class PrefixIndex:
+    """
+    Sorted array of (key, suggestion) pairs: a prefix lookup is one bisect plus
+    a forward scan over the matching run.
+    """
+
+    def __init__(self, entries):
+        pairs = sorted(entries, key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.values = [value for _, value in pairs]
+        self.packages = frozenset(value["label"] for value in self.values if value["type"] == "package")
+
+    def _run(self, prefix):
+        seen = set()
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            value = self.values[i]
+            identity = (value["type"], value["id"], value["label"])
+            if identity not in seen:
+                seen.add(identity)
+                yield value
+            i += 1
+
+    def matches(self, prefix, cap):
+        """
+        (best `cap` distinct suggestions by rank, complete) for keys starting with
+        `prefix`. The whole run is ranked through a bounded heap, so the best matches
+        are kept even when more than `cap` match; complete is False in that case.
+        """
+        total = 0
+
+        def counted():
+            nonlocal total
+            for value in self._run(prefix):
+                total += 1
+                yield value
+
+        best = heapq.nsmallest(cap, counted(), key=_rank)
+        return best, total <= cap
+
+
+def _suggestion_keys(value):
+    return [key for field in ("label", "detail") for key in _keys(value.get(field))]
+
+
+class SuggestService:
+    """
+    Typeahead over customer names/emails, usernames/emails and package types.
+
+    The prefix index is rebuilt lazily after a commit changes one of the
+    INDEXED_COLUMNS, adds or removes a customer / user, or brings a new package
+    type (and at least every SUGGEST_INDEX_TTL seconds for other workers' writes). Recent prefixes are kept in an LRU; when a prefix extends
+    a cached one whose match list was complete, the cached (ranked) list is
+    filtered in memory instead of scanning the index again.
+    """
+
+    def __init__(self, cache_size=512, ttl=60, complete_cap=200):
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.complete_cap = complete_cap   # cache full match lists up to this size
+        self._index = None
+        self._built_at = 0.0
+        self._stale = True
+        self._cache = OrderedDict()        # prefix -> (matches, complete)
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._stale = True
+
+    def has_package(self, package_type):
+        """Whether the current index already suggests this package type (True if none is built yet)."""
+        index = self._index
+        return index is None or package_type in index.packages
+
+    def _ensure_index(self):
+        if not self._stale and self._index is not None and time.monotonic() - self._built_at < self.ttl:
+            return self._index
+        with self._lock:
+            if self._stale or self._index is None or time.monotonic() - self._built_at >= self.ttl:
+                self._stale = False
+                self._index = PrefixIndex(self._load_entries())
+                self._built_at = time.monotonic()
+                self._cache.clear()
+            return self._index
+
+    def _load_entries(self):
+        suggestions = []
+        for id_, name, email in db.session.query(Customer.id, Customer.name, Customer.email):
+            suggestions.append({"type": "customer", "id": id_, "label": name, "detail": email})
+        for id_, username, email, role in db.session.query(User.id, User.username, User.email, User.role):
+            suggestions.append({"type": "user", "id": id_, "label": username, "detail": email, "role": role})
+        for (package_type,) in db.session.query(Installation.package_type).distinct():
+            suggestions.append({"type": "package", "id": None, "label": package_type, "detail": None})
+        return [(key, value) for value in suggestions for key in _suggestion_keys(value)]
+
+    def _cached(self, prefix):
+        """Matches for `prefix` from the LRU, or from the longest complete cached prefix of it."""
+        with self._lock:
+            entry = self._cache.get(prefix)
+            if entry is not None:
+                self._cache.move_to_end(prefix)
+                return entry
+            for end in range(len(prefix) - 1, 0, -1):
+                shorter = self._cache.get(prefix[:end])
+                if shorter is not None and shorter[1]:
+                    matches = [value for value in shorter[0]
+                               if any(key.startswith(prefix) for key in _suggestion_keys(value))]
+                    return matches, True
+        return None
+
+    def _remember(self, prefix, entry):
+        with self._lock:
+            self._cache[prefix] = entry
+            self._cache.move_to_end(prefix)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def suggest(self, q, limit=8):
+        prefix = q.lower().strip()
+        if not prefix:
+            return []
+        index = self._ensure_index()
+
+        entry = self._cached(prefix)
+        if entry is None:
+            entry = index.matches(prefix, self.complete_cap)
+        self._remember(prefix, entry)
+
+        # Entries hold the best complete_cap matches in rank order (all of them when
+        # complete), so the top `limit` is a prefix of the list
+        return entry[0][:limit]
+
+
+suggest_service = SuggestService(
+    cache_size=Config.SUGGEST_CACHE_SIZE, ttl=Config.SUGGEST_INDEX_TTL,
+)
+
+
+def _changes_index(session, obj):
+    """Whether flushing `obj` can change the suggestions (an installation's status can't)."""
+    if obj in session.deleted:
+        return True
+    if obj in session.new:
+        # A new job only matters for a package type that isn't suggested yet
+        return not isinstance(obj, Installation) or not suggest_service.has_package(obj.package_type)
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in INDEXED_COLUMNS[type(obj)])
+
+
+@event.listens_for(db.session, "before_flush")
+def _note_suggest_writes(session, flush_context, instances):
+    if session.info.get("suggest_stale"):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if type(obj) in INDEXED_COLUMNS and _changes_index(session, obj):
+            session.info["suggest_stale"] = True
+            return
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("suggest_stale", False):
+        suggest_service.invalidate()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("suggest_stale", None)
@@ -0,0 +1,134 @@
+# backend/utils/summaries.py
+import threading
+import time
+from datetime import timedelta
+from sqlalchemy import case, event, func
+from models import db, Installation, Invoice
+from utils.finance_metrics import finance_summary_metrics, finance_breakdown_metrics
+from utils.invoices import INVOICE_STATUSES
+from utils.time_buckets import bucketed_totals
+from config import Config
+
+OUTSTANDING_STATUSES = ("Scheduled", "In Progress")
+
+
+class SummaryCache:
+    """
+    Tiny TTL cache for dashboard aggregates. Cleared after any commit that
+    touched an Invoice or Installation; the TTL bounds staleness from other
+    worker processes.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        if self.ttl <= 0:
+            return compute()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        value = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+summary_cache = SummaryCache(ttl=Config.SUMMARY_CACHE_TTL)
+
+
+@event.listens_for(db.session, "before_flush")
+def _note_summary_writes(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Invoice, Installation)):
+            session.info["summaries_stale"] = True
+            return
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("summaries_stale", False):
+        summary_cache.invalidate()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("summaries_stale", None)
+
+
+def _paid(column):
+    return case((Invoice.status == "paid", column))
+
+
+def invoice_totals():
+    """Per-status counts plus paid sum / average, in one conditional-aggregation pass."""
+    row = db.session.query(
+        *[func.coalesce(func.sum(case((Invoice.status == status, 1), else_=0)), 0).label(status)
+          for status in INVOICE_STATUSES],
+        func.coalesce(func.sum(_paid(Invoice.amount)), 0).label("paid_amount"),
+        func.coalesce(func.avg(_paid(Invoice.amount)), 0).label("paid_average"),
+    ).one()
+    return row._asdict()
+
+
+def installation_totals():
+    row = db.session.query(
+        func.coalesce(func.sum(case((Installation.status == "Completed", 1), else_=0)), 0).label("completed"),
+        func.coalesce(func.sum(case((Installation.status.in_(OUTSTANDING_STATUSES), 1), else_=0)), 0)
+        .label("outstanding"),
+    ).one()
+    return row._asdict()
+
+
+def paid_revenue_series(unit, start, end):
+    """Paid invoice count / revenue per bucket over [start, end), gaps zero-filled."""
+    return bucketed_totals(Invoice.created_at, Invoice.amount, unit, start, end, Invoice.status == "paid")
+
+
+def monthly_paid_revenue():
+    first, last = db.session.query(func.min(Invoice.created_at), func.max(Invoice.created_at)) \
+        .filter(Invoice.status == "paid").one()
+    if first is None:
+        return []
+    series = paid_revenue_series("month", first, last + timedelta(seconds=1))
+    return [{"month": entry["label"], "revenue": entry["total"]} for entry in series]
+
+
+def invoice_summary():
+    def compute():
+        totals = invoice_totals()
+        return {
+            "total_revenue": totals["paid_amount"],
+            "pending": totals["pending"],
+            "paid": totals["paid"],
+            "overdue": totals["overdue"],
+        }
+    return summary_cache.get_or_compute("invoice_summary", compute)
+
+
+def live_finance_summary():
+    invoices = invoice_totals()
+    installations = installation_totals()
+    return {
+        "total_revenue": float(invoices["paid_amount"] or 0),
+        "jobs_completed": installations["completed"],
+        "outstanding_jobs": installations["outstanding"],
+        "average_price": round(float(invoices["paid_average"] or 0), 2),
+        "monthly_revenue": monthly_paid_revenue(),
+    }
+
+
+def finance_summary(source=None):
+    source = source or Config.FINANCE_SUMMARY_SOURCE
+    compute = live_finance_summary if source == "live" else finance_summary_metrics
+    return summary_cache.get_or_compute(("finance_summary", source), compute)
+
+
+def finance_breakdown():
+    return summary_cache.get_or_compute("finance_breakdown", finance_breakdown_metrics)
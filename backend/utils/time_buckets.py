@@ -0,0 +1,120 @@
+# backend/utils/time_buckets.py
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import Integer, cast, func
+from models import db
+
+UNITS = ("day", "week", "month", "quarter")
+
+
+def bucket_start(value, unit):
+    """First day of the bucket containing `value` (weeks start on Monday)."""
+    day = value.date() if isinstance(value, datetime) else value
+    if unit == "day":
+        return day
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "month":
+        return day.replace(day=1)
+    if unit == "quarter":
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    raise ValueError(f"Unknown bucket unit: {unit}")
+
+
+def next_bucket(start, unit):
+    if unit == "day":
+        return start + timedelta(days=1)
+    if unit == "week":
+        return start + timedelta(days=7)
+    months = 1 if unit == "month" else 3
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def bucket_label(start, unit):
+    if unit == "month":
+        return start.strftime("%Y-%m")
+    if unit == "quarter":
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return start.isoformat()
+
+
+def bucket_expression(column, unit, dialect):
+    """SQL expression for the bucket start, or None when the dialect has no support (bucketed in Python)."""
+    if dialect == "postgresql":
+        return func.date_trunc(unit, column)
+    if dialect == "sqlite":
+        if unit == "day":
+            return func.date(column)
+        if unit == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        if unit == "month":
+            return func.date(column, "start of month")
+        if unit == "quarter":
+            months_in = (cast(func.strftime("%m", column), Integer) - 1) % 3
+            return func.date(column, "start of month", func.printf("-%d months", months_in))
+    return None
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def bucketed_totals(time_column, value_column, unit, start, end, *filters):
+    """
+    [{"bucket", "label", "count", "total"}, ...] for rows with start <= time < end,
+    one entry per bucket including empty ones.
+
+    The WHERE clause is a plain range on time_column so an index on it drives
+    the scan; grouping happens on the bucket expression over that slice only.
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown bucket unit: {unit}")
+    first = bucket_start(start, unit)
+    start = datetime.combine(first, datetime.min.time())
+    end = datetime.combine(end, datetime.min.time()) if not isinstance(end, datetime) else end
+
+    in_range = [time_column >= start, time_column < end, *filters]
+    totals = defaultdict(lambda: [0, 0.0])
+    expression = bucket_expression(time_column, unit, db.engine.dialect.name)
+
+    if expression is not None:
+        bucket = expression.label("bucket")
+        rows = db.session.query(bucket, func.count(), func.coalesce(func.sum(value_column), 0)) \
+            .filter(*in_range).group_by(bucket)
+        for value, count, total in rows:
+            totals[_as_date(value)] = [count, float(total)]
+    else:
+        rows = db.session.query(time_column, value_column).filter(*in_range).order_by(time_column)
+        for moment, value in rows.yield_per(1000):
+            entry = totals[bucket_start(moment, unit)]
+            entry[0] += 1
+            entry[1] += float(value or 0)
+
+    series = []
+    current = first
+    while datetime.combine(current, datetime.min.time()) < end:
+        count, total = totals.get(current, (0, 0.0))
+        series.append({"bucket": current.isoformat(), "label": bucket_label(current, unit),
+                       "count": count, "total": total})
+        current = next_bucket(current, unit)
+    return series
+
+
+def fill_months(revenue_by_month):
+    """Zero-fill a {"YYYY-MM": revenue} map between its first and last month, in order."""
+    if not revenue_by_month:
+        return []
+    months = sorted(revenue_by_month)
+    current = date.fromisoformat(months[0] + "-01")
+    last = date.fromisoformat(months[-1] + "-01")
+    filled = []
+    while current <= last:
+        label = bucket_label(current, "month")
+        filled.append({"month": label, "revenue": float(revenue_by_month.get(label, 0.0))})
+        current = next_bucket(current, "month")
+    return filled